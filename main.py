@@ -1,26 +1,163 @@
 import asyncio
+import atexit
 import logging
 import random
 import os
 import json
+import queue
 import signal
 import sys
 import re
+from array import array
+from collections import deque
+from contextvars import ContextVar
 from datetime import datetime, timedelta
+from functools import cached_property
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
-from typing import Dict, Optional, List
-from telegram import Bot, Update
-from telegram.ext import Application, CommandHandler, ContextTypes
-from apscheduler.schedulers.asyncio import AsyncIOScheduler
-import colorama
-from colorama import Fore, Style
-from utils.time_handler import ResilientScheduler
-from utils.security_manager import SecurityManager, SecureConfigManager, SecurityError
-from utils.bot_controller import BotController
-from utils.multi_instance_manager import MultiInstanceManager
+from types import SimpleNamespace
+from typing import TYPE_CHECKING, Dict, Optional, List
 
-# Initialize colors
-colorama.init()
+# telegram, apscheduler, cryptography and the utils modules that pull them in
+# are imported where first needed, so CLI paths like --list-instances start fast
+if TYPE_CHECKING:
+    from telegram.error import RetryAfter
+
+# Initialize colors only for an interactive terminal; as a background
+# service the escape codes (and colorama's stream wrapper) are pure overhead
+USE_COLOR = sys.stdout.isatty()
+if USE_COLOR:
+    import colorama
+    colorama.init()
+    Fore, Style = colorama.Fore, colorama.Style
+else:
+    Fore = SimpleNamespace(GREEN='', RED='', YELLOW='', CYAN='')
+    Style = SimpleNamespace(RESET_ALL='')
+
+# Per-send console lines, colored once at import
+_FMT_SENT = f"{Fore.GREEN}✓ Sent to: %s{Style.RESET_ALL}"
+_FMT_FAIL = f"{Fore.RED}✗ Failed %s: %s{Style.RESET_ALL}"
+_FMT_BATCH = f"{Fore.CYAN}Batch complete: %d/%d sent{Style.RESET_ALL}"
+
+# Allowed Telegram HTML tags (kept) or disallowed characters (dropped)
+_SANITIZE_RE = re.compile(r'(</?(?:[bi]|code|pre)>)|[<>&\x00-\x1f\x7f-\x9f]', re.IGNORECASE)
+
+# Telegram group ID: negative, within [-9999999999999, -1]
+_GROUP_ID_RE = re.compile(r'-[1-9]\d{0,12}\Z', re.ASCII)
+
+# Parsed config files: path -> (mtime_ns, size, parsed object)
+_CONFIG_CACHE: Dict[Path, tuple] = {}
+
+def _cached_parse(path: Path, parser):
+    """Return parsed file content, reusing the cached result while mtime and size are unchanged"""
+    st = path.stat()
+    cached = _CONFIG_CACHE.get(path)
+    if cached is not None and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+        return cached[2]
+        
+    # Read through one descriptor and key the cache on its fstat, so the
+    # cached stamp always describes the bytes that were parsed
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        st = os.fstat(fd)
+        chunks = []
+        while chunk := os.read(fd, max(st.st_size, 4096)):
+            chunks.append(chunk)
+    finally:
+        os.close(fd)
+        
+    parsed = parser(b''.join(chunks).decode('utf-8'))
+    _CONFIG_CACHE[path] = (st.st_mtime_ns, st.st_size, parsed)
+    return parsed
+
+def _parse_lines(text: str) -> tuple:
+    """Parse non-empty, stripped lines"""
+    return tuple(line for raw in text.splitlines() if (line := raw.strip()))
+
+def _parse_settings(text: str) -> Dict[str, str]:
+    """Parse key=value settings lines"""
+    return {
+        key.strip(): value.strip()
+        for key, sep, value in (line.partition('=') for line in text.splitlines())
+        if sep
+    }
+
+def _parse_interval(value) -> Optional[int]:
+    """Parse interval_minutes: 1 minute to 24 hours"""
+    interval = int(value)
+    return interval if 1 <= interval <= 1440 else None
+
+def _parse_admin_ids(value) -> list:
+    """Parse admin_ids from a JSON list or a comma-separated string"""
+    if isinstance(value, str):
+        value = [x for x in value.split(',') if x.strip()]
+    # Reasonable Telegram user ID range
+    return [uid for uid in map(int, value) if 1 <= uid <= 9999999999]
+
+def _parse_bool(value) -> bool:
+    """Parse a JSON bool or a legacy string flag"""
+    if isinstance(value, str):
+        return value.strip().lower() in ('1', 'true', 'yes', 'on')
+    return bool(value)
+
+def _parse_concurrency(value) -> Optional[int]:
+    """Parse send_concurrency: Telegram's global limit is ~30 msg/sec"""
+    concurrency = int(value)
+    return concurrency if 1 <= concurrency <= 30 else None
+
+def _load_lines(path: Path) -> tuple:
+    """Load non-empty lines from a config file (cached)"""
+    return _cached_parse(path, _parse_lines)
+
+def _load_settings(path: Path) -> Dict[str, str]:
+    """Load key=value settings from a config file (cached)"""
+    return dict(_cached_parse(path, _parse_settings))
+
+def _atomic_write(path: Path, data: str):
+    """Write a file via a sibling .tmp and os.replace so a crash never truncates it"""
+    tmp = path.with_suffix(path.suffix + '.tmp')
+    with open(tmp, 'w', encoding='utf-8') as f:
+        f.write(data)
+        f.flush()
+        # Data must hit storage before the rename, or a power loss can leave an empty file
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+def _append_lines(path: Path, lines: List[str]):
+    """Append lines to a text file, starting on a fresh line"""
+    with open(path, 'a+b') as f:
+        data = ''.join(f"{line}\n" for line in lines).encode('utf-8')
+        if f.tell() > 0:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b'\n':
+                data = b'\n' + data
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+
+def _load_json(path: Path) -> dict:
+    """Load a JSON config file (cached)"""
+    return dict(_cached_parse(path, json.loads))
+
+# Instance name for log records; asyncio tasks inherit it from the context
+# that created them
+_INSTANCE_NAME: ContextVar[str] = ContextVar('instance_name', default='default')
+
+# Process-wide log listener, started by the first setup_logging() call
+_log_listener: Optional[QueueListener] = None
+
+class _InstanceFilter(logging.Filter):
+    """Stamp records with the current instance name"""
+    
+    def filter(self, record):
+        record.instance = _INSTANCE_NAME.get()
+        return True
+
+def _list_instance_dirs(path: Path) -> List[str]:
+    """Instance directory names"""
+    # DirEntry.is_dir() uses the readdir type field, no stat per entry
+    with os.scandir(path) as entries:
+        return [entry.name for entry in entries if entry.is_dir()]
 
 class AndroidTelegramBot:
     """
@@ -45,6 +182,11 @@ class AndroidTelegramBot:
         self.logs_dir.mkdir(parents=True, exist_ok=True)
         
         self.setup_logging()
+        
+        from utils.time_handler import ResilientScheduler
+        from utils.security_manager import SecurityManager, SecureConfigManager
+        from utils.bot_controller import BotController
+        
         self.security_manager = SecurityManager()
         self.config_manager = SecureConfigManager(self.security_manager, self.config_dir)
         self.scheduler = ResilientScheduler()
@@ -54,121 +196,261 @@ class AndroidTelegramBot:
         self.app = None
         self.is_running = False
         self.messaging_active = False
+        self._messaging_task: Optional[asyncio.Task] = None
+        self.next_message_time: Optional[datetime] = None
+        self._stop_event: Optional[asyncio.Event] = None  # Created in run() once a loop exists
+        self._shutting_down = False
         
-        # Android-compatible signal handling
-        self._setup_signal_handlers()
+        # Concurrent send limit (Telegram: ~30 msg/sec global, 20 msg/min per group);
+        # sized from the send_concurrency setting on first send
+        self._send_semaphore: Optional[asyncio.Semaphore] = None
+        
+        # Per-instance PRNG for message picks and retry jitter
+        self._rng = random.Random()
         
-        self.load_config()
+        # Opt-in batching: join pending messages per group into one send
+        self.batch_chars = 4096  # Telegram per-message limit
+        self.max_pending = 100  # Per group; only grows while sends keep failing
+        self._pending: Dict[int, deque] = {}
+        
+        # Loop time of the next free send slot (see _pace_send)
+        self._next_send_at = 0.0
+        
+        # chat_id -> loop time before which Telegram asked us not to send
+        self._retry_at: Dict[int, float] = {}
+        
+        # Config values (messages, groups, settings) load lazily on first access;
+        # _dirty tracks which files have unsaved changes
+        self._dirty: set = set()
+        # Pending groups.txt records ("+id"/"-id") and the file's current line count
+        self._group_ops: List[str] = []
+        self._groups_log_lines = 0
         
     def setup_logging(self):
-        """Setup instance-specific logging"""
-        log_file = self.logs_dir / 'bot_activity.log'
-        
-        logging.basicConfig(
-            level=logging.INFO,
-            format=f'[{self.instance_name}] %(asctime)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler(log_file, encoding='utf-8'),
-                logging.StreamHandler()
-            ]
-        )
-        
-        # Reduce telegram library verbosity 
-        logging.getLogger('telegram').setLevel(logging.WARNING)
-        logging.getLogger('httpx').setLevel(logging.WARNING)
+        """Setup instance-specific logging (handlers are installed once per process)"""
+        global _log_listener
+        _INSTANCE_NAME.set(self.instance_name)
+        
+        if _log_listener is None:
+            log_file = self.logs_dir / 'bot_activity.log'
+            
+            # Skip record fields that are never used in our format
+            logging.logThreads = False
+            logging.logProcesses = False
+            logging.logMultiprocessing = False
+            
+            formatter = logging.Formatter('[%(instance)s] %(asctime)s - %(levelname)s - %(message)s')
+            
+            # Bounded log file
+            file_handler = RotatingFileHandler(log_file, maxBytes=2_000_000, backupCount=3,
+                                               encoding='utf-8', delay=True)
+            file_handler.setFormatter(formatter)
+            stream_handler = logging.StreamHandler()
+            stream_handler.setFormatter(formatter)
+            
+            # Handlers run on a listener thread; logging calls on the event loop only enqueue
+            log_queue = queue.SimpleQueue()
+            _log_listener = QueueListener(log_queue, file_handler, stream_handler,
+                                          respect_handler_level=True)
+            _log_listener.start()
+            # Exits that skip shutdown() (e.g. failed initialization) must still
+            # drain the queue, or the daemon thread dies with records pending
+            atexit.register(_log_listener.stop)
+            
+            # Records are formatted once, by the listener's handlers; the instance
+            # name is stamped in the producing thread/task's context
+            queue_handler = QueueHandler(log_queue)
+            queue_handler.setFormatter(logging.Formatter('%(message)s'))
+            queue_handler.addFilter(_InstanceFilter())
+            
+            logging.basicConfig(
+                level=logging.INFO,
+                handlers=[queue_handler]
+            )
+            
+            # Reduce telegram library verbosity 
+            logging.getLogger('telegram').setLevel(logging.WARNING)
+            logging.getLogger('httpx').setLevel(logging.WARNING)
         
+        self._log_listener = _log_listener
         self.logger = logging.getLogger(__name__)
         
     def _setup_signal_handlers(self):
-        """Setup Android-compatible signal handlers"""
-        try:
-            # Standard signals
-            signal.signal(signal.SIGINT, self._signal_handler)
-            signal.signal(signal.SIGTERM, self._signal_handler)
+        """Setup Android-compatible signal handlers on the running event loop"""
+        loop = asyncio.get_running_loop()
+        
+        # Standard signals
+        signals = [signal.SIGINT, signal.SIGTERM]
+        
+        # Android-specific handling
+        if hasattr(signal, 'SIGUSR1'):
+            signals.append(signal.SIGUSR1)
             
-            # Android-specific handling
-            if hasattr(signal, 'SIGUSR1'):
-                signal.signal(signal.SIGUSR1, self._signal_handler)
-                
-        except (AttributeError, OSError) as e:
-            self.logger.warning(f"Some signal handlers not available on this platform: {e}")
+        for signum in signals:
+            try:
+                loop.add_signal_handler(signum, self._signal_handler, signum)
+            except NotImplementedError:
+                # Loop refuses signal handlers (Termux/Windows): fall back to a
+                # plain handler that hands the event off to the loop thread-safely
+                try:
+                    signal.signal(signum, lambda s, f: loop.call_soon_threadsafe(self._signal_handler, s))
+                except (ValueError, OSError) as e:
+                    self.logger.warning(f"Signal handler for {signum} not available on this platform: {e}")
+            except (RuntimeError, OSError) as e:
+                self.logger.warning(f"Signal handler for {signum} not available on this platform: {e}")
         
+    # Global send rate, below Telegram's ~30 msg/sec bot limit
+    SEND_RATE = 25
+    
+    # Settings key -> parser (see _settings)
+    _SETTING_PARSERS = {
+        'interval_minutes': _parse_interval,
+        'admin_ids': _parse_admin_ids,
+        'batch_messages': _parse_bool,
+        'send_concurrency': _parse_concurrency,
+    }
+    
+    # Lazily loaded config values, dropped on reload/save
+    _CONFIG_ATTRS = ('messages', 'groups', '_group_ids', '_settings', 'interval_minutes', 'admin_ids',
+                     'batch_messages', 'send_concurrency')
+    
     def load_config(self):
-        """Load configuration with enhanced error handling"""
+        """(Re)load configuration: migrate the token and drop cached config values"""
+        from utils.security_manager import SecurityError
+        
+        # Migrate from plaintext if needed
         try:
-            # Migrate from plaintext if needed
-            try:
-                self.config_manager.migrate_plaintext_token()
-            except SecurityError as e:
-                self.logger.error(f"Token migration failed: {e}")
+            self.config_manager.migrate_plaintext_token()
+        except SecurityError as e:
+            self.logger.error(f"Token migration failed: {e}")
             
-            # Load messages with validation
-            messages_file = self.config_dir / 'messages.txt'
-            if messages_file.exists():
-                try:
-                    with open(messages_file, 'r', encoding='utf-8') as f:
-                        messages = [line.strip() for line in f if line.strip()]
-                        # Sanitize messages
-                        self.messages = [self._sanitize_message(msg) for msg in messages if msg]
-                except Exception as e:
-                    self.logger.error(f"Failed to load messages: {e}")
-                    self.messages = ["Default message"]
-            else:
-                self.messages = ["Testowa wiadomość"]
+        self._invalidate_config()
+        
+    def _invalidate_config(self):
+        """Drop cached config values (and unsaved changes) so the next access re-reads them"""
+        for name in self._CONFIG_ATTRS:
+            self.__dict__.pop(name, None)
+        self._dirty.clear()
+        self._group_ops.clear()
+        self._send_semaphore = None
+            
+    @cached_property
+    def messages(self) -> tuple:
+        """Sanitized messages from messages.txt (loaded on first access)"""
+        try:
+            messages = _load_lines(self.config_dir / 'messages.txt')
+            # Sanitize messages
+            return tuple(self._sanitize_message(msg) for msg in messages if msg)
+        except FileNotFoundError:
+            return ("Testowa wiadomość",)
+        except Exception as e:
+            self.logger.error(f"Failed to load messages: {e}")
+            return ("Default message",)
+            
+    @cached_property
+    def groups(self) -> array:
+        """Validated group IDs from groups.txt (loaded on first access)"""
+        try:
+            lines = _load_lines(self.config_dir / 'groups.txt')
+            # Replay the file: plain or "+<id>" lines add a group, "-<id>" lines
+            # (i.e. "--100...") remove one. Validate and convert once to the int
+            # form Telegram expects, deduplicated and keeping file order
+            groups = {}
+            for line in lines:
+                if line.startswith('--'):
+                    if self._validate_group_id(line[1:]):
+                        groups.pop(int(line[1:]), None)
+                    continue
+                if line.startswith('+'):
+                    line = line[1:]
+                if self._validate_group_id(line):
+                    groups[int(line)] = None
+                    
+            self._groups_log_lines = len(lines)
+            # A packed int64 array is compact and passes ints straight to chat_id
+            return array('q', groups)
+        except FileNotFoundError:
+            return array('q')
+        except Exception as e:
+            self.logger.error(f"Failed to load groups: {e}")
+            return array('q')
+            
+    @cached_property
+    def _group_ids(self) -> frozenset:
+        """Hash index over groups for O(1) membership checks"""
+        return frozenset(self.groups)
+        
+    def has_group(self, group_id: int) -> bool:
+        """Check whether a group is configured"""
+        return group_id in self._group_ids
+        
+    @cached_property
+    def _settings(self) -> dict:
+        """Validated settings from settings.json / legacy settings.txt (loaded on first access)"""
+        settings_file = self.config_dir / 'settings.json'
+        legacy_settings_file = self.config_dir / 'settings.txt'
+        validated = {
+            'interval_minutes': 5,  # Default safe interval
+            'admin_ids': [],
+            'batch_messages': False,
+            'send_concurrency': 5
+        }
+        
+        try:
+            # Legacy key=value settings.txt is migrated to settings.json; it still
+            # wins when edited after the last migration (setup scripts write it)
+            migrate_settings = legacy_settings_file.exists() and (
+                not settings_file.exists()
+                or legacy_settings_file.stat().st_mtime > settings_file.stat().st_mtime
+            )
+            
+            if not (migrate_settings or settings_file.exists()):
+                return validated
                 
-            # Load groups with validation
-            groups_file = self.config_dir / 'groups.txt'
-            if groups_file.exists():
-                try:
-                    with open(groups_file, 'r', encoding='utf-8') as f:
-                        groups = [line.strip() for line in f if line.strip()]
-                        # Validate group IDs
-                        self.groups = [group for group in groups if self._validate_group_id(group)]
-                except Exception as e:
-                    self.logger.error(f"Failed to load groups: {e}")
-                    self.groups = []
+            if migrate_settings:
+                settings = _load_settings(legacy_settings_file)
             else:
-                self.groups = []
+                settings = _load_json(settings_file)
                 
-            # Load settings with validation
-            settings_file = self.config_dir / 'settings.txt'
-            self.interval_minutes = 5  # Default safe interval
-            self.admin_ids = []
-            
-            if settings_file.exists():
+            # One dict lookup per key; each parser raises ValueError on bad input
+            # and returns None for well-formed values outside the allowed range
+            for key, value in settings.items():
+                parse = self._SETTING_PARSERS.get(key)
+                if parse is None:
+                    continue
                 try:
-                    with open(settings_file, 'r', encoding='utf-8') as f:
-                        for line in f:
-                            if '=' in line:
-                                key, value = line.strip().split('=', 1)
-                                key = key.strip()
-                                value = value.strip()
-                                
-                                if key == 'interval_minutes':
-                                    try:
-                                        interval = int(value)
-                                        if 1 <= interval <= 1440:  # 1 minute to 24 hours
-                                            self.interval_minutes = interval
-                                    except ValueError:
-                                        self.logger.warning(f"Invalid interval value: {value}")
-                                        
-                                elif key == 'admin_ids':
-                                    try:
-                                        admin_ids = [int(x.strip()) for x in value.split(',') if x.strip().isdigit()]
-                                        # Validate admin IDs (reasonable Telegram user ID range)
-                                        self.admin_ids = [uid for uid in admin_ids if 1 <= uid <= 9999999999]
-                                    except ValueError:
-                                        self.logger.warning(f"Invalid admin IDs: {value}")
-                except Exception as e:
-                    self.logger.error(f"Failed to load settings: {e}")
-                    
+                    parsed = parse(value)
+                except (TypeError, ValueError):
+                    self.logger.warning(f"Invalid {key} value: {value}")
+                    continue
+                if parsed is not None:
+                    validated[key] = parsed
+                
+            if migrate_settings:
+                self._save_settings(validated)
+                self.logger.info("Settings migrated to settings.json")
+                
         except Exception as e:
-            self.logger.error(f"Config loading failed: {e}")
-            # Fallback values
-            self.messages = ["Fallback message"]
-            self.groups = []
-            self.interval_minutes = 5
-            self.admin_ids = []
+            self.logger.error(f"Failed to load settings: {e}")
+            
+        return validated
+        
+    @cached_property
+    def interval_minutes(self) -> int:
+        return self._settings['interval_minutes']
+        
+    @cached_property
+    def admin_ids(self) -> frozenset:
+        # Checked on every command: hash lookup instead of a scan
+        return frozenset(self._settings['admin_ids'])
+        
+    @cached_property
+    def batch_messages(self) -> bool:
+        return self._settings['batch_messages']
+        
+    @cached_property
+    def send_concurrency(self) -> int:
+        return self._settings['send_concurrency']
             
     def _sanitize_message(self, message: str) -> str:
         """Sanitize message content for security"""
@@ -176,62 +458,120 @@ class AndroidTelegramBot:
             return "Invalid message"
             
         # Remove potentially dangerous characters but keep Telegram formatting
-        # Allow basic Telegram HTML tags
-        allowed_pattern = re.compile(r'[^<>&\n\r\t\x00-\x1f\x7f-\x9f]|</?[bi]>|</?code>|</?pre>', re.IGNORECASE)
-        sanitized = ''.join(allowed_pattern.findall(message))
+        # (basic HTML tags survive via the captured group)
+        sanitized = _SANITIZE_RE.sub(r'\1', message)
         
         return sanitized[:4000]  # Telegram limit
         
     def _validate_group_id(self, group_id: str) -> bool:
         """Validate Telegram group ID format"""
-        if not group_id:
-            return False
-            
         # Telegram group IDs are negative numbers, often starting with -100
-        if group_id.startswith('-') and group_id[1:].isdigit():
-            try:
-                gid = int(group_id)
-                # Reasonable range for Telegram group IDs
-                return -9999999999999 <= gid <= -1
-            except ValueError:
-                return False
-        return False
+        return bool(group_id) and _GROUP_ID_RE.match(group_id) is not None
+            
+    # Config containers are never mutated in place: mutators swap in a new
+    # object, so a send batch already iterating the old one is unaffected
+    
+    def add_group(self, group_id: int):
+        """Add a target group; persisted by the next save_config()"""
+        if self.has_group(group_id):
+            raise ValueError(f"Group {group_id} already configured")
+        self.groups = self.groups + array('q', (group_id,))
+        self.__dict__.pop('_group_ids', None)
+        self._group_ops.append(f"+{group_id}")
+        self._dirty.add('groups')
+        
+    def remove_group(self, group_id: int):
+        """Remove a target group; persisted by the next save_config()"""
+        if not self.has_group(group_id):
+            raise ValueError(f"Group {group_id} not configured")
+        self.groups = array('q', (g for g in self.groups if g != group_id))
+        self.__dict__.pop('_group_ids', None)
+        self._group_ops.append(f"-{group_id}")
+        self._dirty.add('groups')
+        
+    def set_messages(self, messages):
+        """Replace the message list; persisted by the next save_config()"""
+        self.messages = tuple(self._sanitize_message(m) for m in messages)
+        self._dirty.add('messages')
+        
+    def set_interval(self, minutes: int):
+        """Change the messaging interval; persisted by the next save_config()"""
+        self.interval_minutes = minutes
+        self._dirty.add('settings')
             
     def save_config(self):
-        """Save current configuration to files with error handling"""
+        """Save changed configuration files with error handling (safe to run in a worker thread)"""
+        # Claim the pending changes up front: mutations made while the files
+        # are being written mark the fresh set and are saved next time
+        dirty, self._dirty = self._dirty, set()
+        if not dirty:
+            return
+            
         try:
             # Save messages
-            with open(self.config_dir / 'messages.txt', 'w', encoding='utf-8') as f:
-                for message in self.messages:
-                    sanitized = self._sanitize_message(message)
-                    f.write(sanitized + '\n')
+            if 'messages' in dirty:
+                # Messages are sanitized on load and in set_messages()
+                _atomic_write(self.config_dir / 'messages.txt',
+                              ''.join(f"{m}\n" for m in self.messages))
                 
-            # Save groups
-            with open(self.config_dir / 'groups.txt', 'w', encoding='utf-8') as f:
-                for group in self.groups:
-                    if self._validate_group_id(group):
-                        f.write(group + '\n')
+            # Save groups: append add/remove records while the log stays small,
+            # otherwise compact it into a plain list
+            if 'groups' in dirty:
+                ops, self._group_ops = self._group_ops, []
+                groups_file = self.config_dir / 'groups.txt'
+                log_lines = self._groups_log_lines + len(ops)
+                try:
+                    if ops and groups_file.exists() and log_lines <= 2 * max(len(self.groups), 8):
+                        _append_lines(groups_file, ops)
+                        self._groups_log_lines = log_lines
+                    else:
+                        _atomic_write(groups_file,
+                                      ''.join(f"{g}\n" for g in self.groups if self._validate_group_id(str(g))))
+                        self._groups_log_lines = len(self.groups)
+                except Exception:
+                    self._group_ops[:0] = ops
+                    raise
                 
             # Save settings
-            with open(self.config_dir / 'settings.txt', 'w', encoding='utf-8') as f:
-                f.write(f"interval_minutes={self.interval_minutes}\n")
-                f.write(f"admin_ids={','.join(map(str, self.admin_ids))}\n")
+            if 'settings' in dirty:
+                self._save_settings({
+                    'interval_minutes': self.interval_minutes,
+                    'admin_ids': list(self._settings['admin_ids']),  # Keep file order
+                    'batch_messages': self.batch_messages,
+                    'send_concurrency': self.send_concurrency
+                })
+            
+            # In-memory values already match what was written; just drop the
+            # stale parse results
+            for name in ('messages.txt', 'groups.txt', 'settings.json'):
+                _CONFIG_CACHE.pop(self.config_dir / name, None)
                 
             self.logger.info("Configuration saved successfully")
             
         except Exception as e:
+            self._dirty |= dirty
             self.logger.error(f"Failed to save config: {e}")
             
+    def _save_settings(self, settings: dict):
+        """Write settings.json"""
+        _atomic_write(self.config_dir / 'settings.json', json.dumps(settings, indent=2))
+            
     async def initialize(self):
         """Secure bot initialization with enhanced error handling"""
+        from telegram.ext import Application
+        from utils.security_manager import SecurityError
+        
         try:
             # Setup secure directories
             self.config_manager.setup_secure_directories()
             
+            # Migrate plaintext token and (re)load config
+            self.load_config()
+            
             # Create secure bot for messaging
             try:
                 token = self.config_manager.get_token()
-                self.bot = await self.security_manager.create_secure_bot(token)
+                self.bot = await self.security_manager.create_secure_bot(token, self.send_concurrency)
             except SecurityError as e:
                 self.logger.error(f"Failed to create secure bot: {e}")
                 return False
@@ -247,8 +587,9 @@ class AndroidTelegramBot:
                 self.logger.error("Bot connection verification failed")
                 return False
                 
-            # Initialize scheduler
+            # Initialize and start scheduler (periodic NTP time sync)
             await self.scheduler.initialize()
+            await self.scheduler.start()
             
             self.is_running = True
             self.logger.info("Bot initialized successfully with enhanced security")
@@ -261,6 +602,8 @@ class AndroidTelegramBot:
             
     async def _setup_command_handlers(self):
         """Setup Telegram command handlers for remote control"""
+        from telegram.ext import CommandHandler
+        
         handlers = [
             CommandHandler("start_bot", self.bot_controller.start_command),
             CommandHandler("stop_bot", self.bot_controller.stop_command),
@@ -281,70 +624,170 @@ class AndroidTelegramBot:
             self.app.add_handler(handler)
             
     async def send_messages_with_retry(self, max_retries: int = 3):
-        """Send messages with retry logic and error handling"""
+        """Send messages to all groups concurrently with retry logic and error handling"""
+        from telegram.error import RetryAfter
+        
         if not self.messages or not self.groups:
             self.logger.warning("No messages or groups configured")
             return
             
-        message = random.choice(self.messages)
-        successful_sends = 0
+        loop = asyncio.get_running_loop()
+        n_groups = len(self.groups)
+        # Pick one message per group in a single C-level call
+        picks = self._rng.choices(self.messages, k=n_groups)
+        if self._send_semaphore is None:
+            self._send_semaphore = asyncio.Semaphore(self.send_concurrency)
+        # Console lines are collected and written once per batch
+        console_lines: List[str] = []
         
-        for group_id in self.groups:
+        async def _send_one(group_id, message: str) -> int:
+            batch = None
+            if self.batch_messages:
+                batch = self._take_batch(group_id, message)
+                message = '\n'.join(batch)
+                
             retry_count = 0
             
             while retry_count < max_retries:
+                # Honour a flood-wait recorded for this chat, possibly by an earlier batch
+                retry_at = self._retry_at.pop(group_id, None)
+                if retry_at is not None and (delay := retry_at - loop.time()) > 0:
+                    await asyncio.sleep(delay)
+                    
                 try:
-                    await self.bot.send_message(chat_id=group_id, text=message)
-                    self.logger.info(f"Message sent to group {group_id}")
-                    print(f"{Fore.GREEN}✓ Sent to: {group_id}{Style.RESET_ALL}")
-                    successful_sends += 1
-                    break
+                    # Bound concurrency and pace sends to stay within Telegram rate limits
+                    async with self._send_semaphore:
+                        await self._pace_send(loop)
+                        await self.bot.send_message(chat_id=group_id, text=message)
+                    # Hottest logging site: once per group per interval
+                    if self.logger.isEnabledFor(logging.INFO):
+                        self.logger.info("Message sent to group %s", group_id)
+                    console_lines.append(_FMT_SENT % group_id)
+                    return 1
                     
                 except Exception as e:
                     retry_count += 1
-                    self.logger.warning(f"Send error to {group_id} (attempt {retry_count}): {e}")
+                    self.logger.warning("Send error to %s (attempt %d): %s", group_id, retry_count, e)
                     
+                    if isinstance(e, RetryAfter):
+                        # Telegram flood-wait: waited out at the top of the next
+                        # attempt (or the next batch); jitter avoids lockstep retries
+                        self._retry_at[group_id] = loop.time() + self._retry_after_seconds(e) * self._rng.uniform(1.0, 1.2)
+                        
                     if retry_count < max_retries:
-                        # Exponential backoff
-                        wait_time = 2 ** retry_count
-                        await asyncio.sleep(wait_time)
+                        # Otherwise capped exponential backoff with jitter.
+                        # Sleep happens outside the semaphore so other groups proceed.
+                        if not isinstance(e, RetryAfter):
+                            await asyncio.sleep(min(2 ** retry_count, 30) + self._rng.uniform(0, 1))
                     else:
-                        self.logger.error(f"Final send error for group {group_id}: {e}")
-                        print(f"{Fore.RED}✗ Failed {group_id}: {e}{Style.RESET_ALL}")
+                        self.logger.error("Final send error for group %s: %s", group_id, e)
+                        console_lines.append(_FMT_FAIL % (group_id, e))
                         
-        print(f"{Fore.CYAN}Batch complete: {successful_sends}/{len(self.groups)} sent{Style.RESET_ALL}")
+            if batch:
+                # Keep undelivered messages queued for the next tick
+                self._pending[group_id].extendleft(reversed(batch))
+            return 0
+            
+        results = await asyncio.gather(*[_send_one(g, m) for g, m in zip(self.groups, picks)], return_exceptions=True)
+        successful_sends = sum(r for r in results if isinstance(r, int))
+                        
+        console_lines.append(_FMT_BATCH % (successful_sends, n_groups))
+        sys.stdout.write('\n'.join(console_lines) + '\n')
+        sys.stdout.flush()
+        
+    async def _pace_send(self, loop: asyncio.AbstractEventLoop):
+        """Token-bucket pacing: at most SEND_RATE sends per second across all groups"""
+        now = loop.time()
+        # Reserve the next slot before sleeping so concurrent senders queue up
+        slot = max(now, self._next_send_at)
+        self._next_send_at = slot + 1 / self.SEND_RATE
+        if slot > now:
+            await asyncio.sleep(slot - now)
+            
+    @staticmethod
+    def _retry_after_seconds(error: 'RetryAfter') -> float:
+        """Flood-wait delay in seconds (int or timedelta depending on library version)"""
+        retry_after = error.retry_after
+        if isinstance(retry_after, timedelta):
+            return retry_after.total_seconds()
+        return float(retry_after)
+        
+    def _take_batch(self, group_id, message: str) -> List[str]:
+        """Queue message for group and pop as many pending messages as fit in one send"""
+        pending = self._pending.setdefault(group_id, deque())
+        pending.append(message)
+        
+        # Failed sends requeue their batch, so the backlog can outgrow the cap;
+        # drop the oldest messages rather than silently losing the newest
+        overflow = len(pending) - self.max_pending
+        if overflow > 0:
+            for _ in range(overflow):
+                pending.popleft()
+            self.logger.warning("Dropped %d oldest pending messages for group %s (limit %d)",
+                                overflow, group_id, self.max_pending)
+            
+        batch = [pending.popleft()]
+        size = len(batch[0])
+        while pending and size + 1 + len(pending[0]) <= self.batch_chars:
+            item = pending.popleft()
+            batch.append(item)
+            size += 1 + len(item)
+            
+        # Overflow items stay queued for the next tick
+        return batch
         
     async def start_messaging(self):
-        """Start scheduled messaging"""
+        """Start periodic messaging"""
         if self.messaging_active:
             return
             
         self.messaging_active = True
         
-        # Add messaging job
-        self.scheduler.add_job(
-            self.send_messages_with_retry,
-            'interval',
-            minutes=self.interval_minutes,
-            id=f'messaging_{self.instance_name}',
-            replace_existing=True
-        )
-        
-        await self.scheduler.start()
+        # A single periodic job needs no scheduler machinery; the scheduler
+        # keeps running for NTP time sync only
+        self._messaging_task = asyncio.create_task(self._messaging_loop())
         self.logger.info(f"Messaging started with {self.interval_minutes}min interval")
         
+    async def _messaging_loop(self):
+        """Send messages every interval until messaging is stopped"""
+        loop = asyncio.get_running_loop()
+        interval = self.interval_minutes * 60
+        next_run = loop.time() + interval
+        
+        try:
+            while self.messaging_active:
+                # Fixed-rate schedule: a slow batch does not push later ones back
+                self.next_message_time = datetime.now() + timedelta(seconds=next_run - loop.time())
+                await asyncio.sleep(next_run - loop.time())
+                next_run = max(next_run + interval, loop.time())
+                
+                try:
+                    # Refresh a stale clock in the background; the send goes out on time
+                    time_handler = self.scheduler.time_handler
+                    if time_handler.is_sync_needed():
+                        time_handler.start_sync_time()
+                        
+                    await self.send_messages_with_retry()
+                except Exception as e:
+                    self.logger.error(f"Messaging batch failed: {e}")
+                    
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self.next_message_time = None
+        
     async def stop_messaging(self):
-        """Stop scheduled messaging"""
+        """Stop periodic messaging"""
         if not self.messaging_active:
             return
             
         self.messaging_active = False
         
-        # Remove messaging job
-        try:
-            self.scheduler.remove_job(f'messaging_{self.instance_name}')
-        except:
-            pass
+        # Cancel the messaging loop and wait for it to exit
+        if self._messaging_task:
+            self._messaging_task.cancel()
+            await asyncio.gather(self._messaging_task, return_exceptions=True)
+            self._messaging_task = None
             
         self.logger.info("Messaging stopped")
         
@@ -356,31 +799,37 @@ class AndroidTelegramBot:
             await self.start_messaging()
             self.logger.info("Messaging restarted")
         
-    def _signal_handler(self, signum, frame):
-        """Handle shutdown signals"""
+    def _signal_handler(self, signum):
+        """Handle shutdown signals (dispatched by the event loop)"""
         print(f"{Fore.YELLOW}Received signal {signum}, shutting down...{Style.RESET_ALL}")
-        asyncio.create_task(self.shutdown())
+        # Wake run(), whose finally block performs the shutdown
+        self._stop_event.set()
         
     async def shutdown(self):
-        """Graceful shutdown"""
+        """Graceful shutdown (only the first call does any work)"""
+        if self._shutting_down:
+            return
+        self._shutting_down = True
         self.logger.info("Starting graceful shutdown...")
         
+        if self._stop_event is not None:
+            self._stop_event.set()
+        
         try:
             # Stop messaging
             await self.stop_messaging()
             
             # Stop scheduler
             if self.scheduler:
-                self.scheduler.shutdown()
+                await self.scheduler.shutdown()
                 
-            # Stop application
+            # Stop application (also closes the bot's HTTP pool)
             if self.app:
                 await self.app.stop()
                 await self.app.shutdown()
-                
-            # Close bot session
-            if self.bot and hasattr(self.bot, '_session'):
-                await self.bot._session.close()
+            elif self.bot:
+                # Close bot HTTP pool
+                await self.bot.shutdown()
                 
             self.is_running = False
             self.logger.info("Shutdown complete")
@@ -388,8 +837,17 @@ class AndroidTelegramBot:
         except Exception as e:
             self.logger.error(f"Shutdown error: {e}")
             
+        # Flush queued log records and stop the listener thread
+        self._log_listener.stop()
+        atexit.unregister(self._log_listener.stop)  # stop() is not safe to call twice
+            
     async def run(self):
         """Main run loop"""
+        self._stop_event = asyncio.Event()
+        
+        # Android-compatible signal handling, integrated with the running loop
+        self._setup_signal_handlers()
+        
         if not await self.initialize():
             print(f"{Fore.RED}Initialization failed for instance {self.instance_name}{Style.RESET_ALL}")
             return
@@ -412,9 +870,8 @@ class AndroidTelegramBot:
             await self.app.initialize()
             await self.app.start()
             
-            # Keep running
-            while self.is_running:
-                await asyncio.sleep(1)
+            # Keep running until shutdown is requested
+            await self._stop_event.wait()
                 
         except KeyboardInterrupt:
             pass
@@ -434,7 +891,7 @@ def main():
     if args.list_instances:
         instances_dir = Path('instances')
         if instances_dir.exists():
-            instances = [d.name for d in instances_dir.iterdir() if d.is_dir()]
+            instances = _list_instance_dirs(instances_dir)
             print(f"Available instances: {', '.join(instances) if instances else 'None'}")
         else:
             print("No instances directory found")
@@ -10,17 +10,32 @@ import json
 import subprocess
 from pathlib import Path
 import argparse
-from typing import Optional
+from typing import List, Optional
 
-def run_command(cmd: str, check: bool = True) -> tuple:
-    """Run shell command and return result"""
-    print(f"Running: {cmd}")
+def run_command(cmd: List[str], check: bool = True, stream: bool = True) -> tuple:
+    """Run command (no shell), streaming its output live, and return result"""
+    print(f"Running: {' '.join(cmd)}")
     try:
-        result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
-        if check and result.returncode != 0:
-            print(f"Error: {result.stderr}")
-            return False, result.stderr
-        return True, result.stdout
+        proc = subprocess.Popen(
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            bufsize=1,
+            env={**os.environ, 'DEBIAN_FRONTEND': 'noninteractive'}  # Never prompt
+        )
+        lines = []
+        for line in proc.stdout:
+            if stream:
+                sys.stdout.write(line)
+            lines.append(line)
+        proc.wait()
+        
+        output = ''.join(lines)
+        if check and proc.returncode != 0:
+            print(f"Error: command exited with code {proc.returncode}")
+            return False, output
+        return True, output
     except Exception as e:
         print(f"Command failed: {e}")
         return False, str(e)
@@ -51,14 +66,13 @@ def install_termux_packages():
     ]
     
     # Update package list
-    success, output = run_command('pkg update -y')
+    success, output = run_command(['pkg', 'update', '-y'])
     if not success:
         print("❌ Failed to update package list")
         return False
         
     # Install packages
-    pkg_cmd = f"pkg install -y {' '.join(packages)}"
-    success, output = run_command(pkg_cmd)
+    success, output = run_command(['pkg', 'install', '-y', *packages])
     if not success:
         print("❌ Failed to install packages")
         return False
@@ -71,14 +85,14 @@ def upgrade_pip():
     print("\n🔄 Upgrading pip...")
     
     commands = [
-        'python -m pip install --upgrade pip',
-        'pip install --upgrade setuptools wheel'
+        [sys.executable, '-m', 'pip', 'install', '--upgrade', 'pip'],
+        [sys.executable, '-m', 'pip', 'install', '--upgrade', 'setuptools', 'wheel']
     ]
     
     for cmd in commands:
         success, output = run_command(cmd)
         if not success:
-            print(f"⚠️  Warning: {cmd} failed, continuing...")
+            print(f"⚠️  Warning: {' '.join(cmd)} failed, continuing...")
             
     print("✓ Pip upgrade completed")
     return True
@@ -91,7 +105,7 @@ def install_python_dependencies():
         print("❌ requirements.txt not found")
         return False
         
-    success, output = run_command('pip install -r requirements.txt')
+    success, output = run_command([sys.executable, '-m', 'pip', 'install', '-r', 'requirements.txt'])
     if not success:
         print("❌ Failed to install Python dependencies")
         return False
@@ -169,8 +183,8 @@ def setup_bot_token(instance_name: str):
     token_file.parent.mkdir(parents=True, exist_ok=True)
     
     try:
-        with open(token_file, 'w', encoding='utf-8') as f:
-            f.write(token)
+        token_file.write_text(token, encoding='utf-8')
+        token_file.chmod(0o600)  # Owner-only until encrypted on first run
         
         print(f"✓ Bot token saved to {token_file}")
         print("ℹ️  Token will be automatically encrypted on first run")
@@ -188,10 +202,12 @@ def setup_sample_config(instance_name: str):
     
     # Sample message
     messages_file = config_dir / 'messages.txt'
-    with open(messages_file, 'w', encoding='utf-8') as f:
-        f.write(f"Hello from {instance_name}!\n")
-        f.write("This is a test message from TPMB Android.\n")
-        f.write("📱 Running on Android via Termux!")
+    messages_file.write_text(
+        f"Hello from {instance_name}!\n"
+        "This is a test message from TPMB Android.\n"
+        "📱 Running on Android via Termux!",
+        encoding='utf-8'
+    )
     
     # Empty groups file
     groups_file = config_dir / 'groups.txt'
@@ -208,14 +224,14 @@ def run_tests():
     print("\n🧪 Running basic tests...")
     
     tests = [
-        ('Python version', 'python --version'),
-        ('Pip version', 'pip --version'),
-        ('Git version', 'git --version'),
-        ('OpenSSL version', 'openssl version')
+        ('Python version', [sys.executable, '--version']),
+        ('Pip version', [sys.executable, '-m', 'pip', '--version']),
+        ('Git version', ['git', '--version']),
+        ('OpenSSL version', ['openssl', 'version'])
     ]
     
     for test_name, cmd in tests:
-        success, output = run_command(cmd, check=False)
+        success, output = run_command(cmd, check=False, stream=False)
         if success:
             print(f"✓ {test_name}: {output.strip()}")
         else:
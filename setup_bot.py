@@ -8,6 +8,16 @@ import os
 import sys
 from pathlib import Path
 
+def _write_small(path: Path, data: str):
+    """Write a small config file owner-only (0o600), without buffered I/O"""
+    fd = os.open(str(path), os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    try:
+        view = memoryview(data.encode('utf-8'))
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+
 def main():
     print("🤖 TPMB Android Configuration Helper")
     print("📱 Samsung Galaxy XCover 7 Edition")
@@ -26,8 +36,7 @@ def main():
     config_dir = Path("instances/default/config")
     config_dir.mkdir(parents=True, exist_ok=True)
     
-    with open(config_dir / "bot_token.txt", "w") as f:
-        f.write(token)
+    _write_small(config_dir / "bot_token.txt", token)
     
     print("✅ Token saved successfully")
     
@@ -37,9 +46,7 @@ def main():
     admin_id = input("🆔 Enter your Telegram user ID: ").strip()
     
     if admin_id.isdigit():
-        with open(config_dir / "settings.txt", "w") as f:
-            f.write(f"interval_minutes=5\n")
-            f.write(f"admin_ids={admin_id}\n")
+        _write_small(config_dir / "settings.txt", f"interval_minutes=5\nadmin_ids={admin_id}\n")
         print("✅ Admin ID configured successfully")
     
     # Set default message
@@ -49,14 +56,12 @@ def main():
         # Neutral, non-promotional test text as requested
         message = "test"
     
-    with open(config_dir / "messages.txt", "w") as f:
-        f.write(message)
+    _write_small(config_dir / "messages.txt", message)
     
     print("✅ Default message set")
     
     # Create empty groups file
-    with open(config_dir / "groups.txt", "w") as f:
-        f.write("")
+    _write_small(config_dir / "groups.txt", "")
     
     print("\n🎉 Configuration completed!")
     print("\n📋 Next steps:")
@@ -147,7 +147,7 @@ certifi>=2023.7.22
 
 # Time handling  
 APScheduler>=3.10.0
-pytz>=2023.3
+tzdata>=2023.3
 
 # Monitoring (lightweight versions)
 colorama>=0.4.6
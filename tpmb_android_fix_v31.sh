@@ -230,7 +230,7 @@ requests>=2.31.0
 
 # Scheduling
 APScheduler>=3.10.0
-pytz>=2023.3
+tzdata>=2023.3
 
 # Monitoring - tylko podstawowe
 colorama>=0.4.6
@@ -252,7 +252,7 @@ python -m pip install aiofiles || log_warning "Problem z aiofiles"
 python -m pip install certifi || log_warning "Problem z certifi"
 python -m pip install requests || log_warning "Problem z requests"
 python -m pip install APScheduler || log_warning "Problem z APScheduler"
-python -m pip install pytz || log_warning "Problem z pytz"
+python -m pip install tzdata || log_warning "Problem z tzdata"
 python -m pip install colorama || log_warning "Problem z colorama"
 
 # 12. TEST IMPORTÓW
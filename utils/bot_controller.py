@@ -1,12 +1,145 @@
 from telegram import Update
 from telegram.ext import ContextTypes
 from telegram.constants import ParseMode
+import asyncio
+import html
 import logging
+from functools import partial
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
     from main import AndroidTelegramBot
 
+# Reply texts, built once at import; templates are bound str.format methods
+_DENY_MSG = (
+    "🚫 <b>Access Denied</b>\n\n"
+    "You are not authorized to control this bot.\n"
+    "Contact the bot owner to get access."
+)
+_ALREADY_RUNNING_TMPL = (
+    "✅ <b>Already Running</b>\n\n"
+    "Bot is already sending messages every {iv} minutes."
+).format
+_STARTED_TMPL = (
+    "🚀 <b>Bot Started</b>\n\n"
+    "✅ Messaging activated\n"
+    "⏱️ Interval: {iv} minutes\n"
+    "👥 Groups: {ng}\n"
+    "💬 Messages: {nm}"
+).format
+_ALREADY_STOPPED_MSG = (
+    "⏹️ <b>Already Stopped</b>\n\n"
+    "Bot messaging is not currently active."
+)
+_STOPPED_MSG = (
+    "⏹️ <b>Bot Stopped</b>\n\n"
+    "✅ Messaging deactivated\n"
+    "ℹ️ Use /start_bot to resume"
+)
+_NEXT_MESSAGE_TMPL = "🕐 Next message: {:%H:%M:%S}\n".format
+_STATUS_TMPL = (
+    "📊 <b>Bot Status - {name}</b>\n\n"
+    "{emoji} Status: <b>{status}</b>\n"
+    "⏱️ Interval: {iv} minutes\n"
+    "👥 Groups: {ng}\n"
+    "💬 Messages: {nm}\n"
+    "{next_msg}"
+    "🔒 Security: ENABLED\n"
+    "📱 Platform: Android\n"
+    "🌐 TLS: ENFORCED"
+).format
+_INTERVAL_USAGE_TMPL = (
+    "⏱️ <b>Set Interval</b>\n\n"
+    "Current interval: <b>{iv} minutes</b>\n\n"
+    "Usage: <code>/set_interval [minutes]</code>\n"
+    "Example: <code>/set_interval 5</code>"
+).format
+_INTERVAL_UPDATED_TMPL = (
+    "✅ <b>Interval Updated</b>\n\n"
+    "Previous: {old} minutes\n"
+    "New: <b>{new} minutes</b>\n\n"
+    "{note}"
+).format
+_INTERVAL_RESTARTED_NOTE = "🔄 Messaging restarted with new interval"
+_INTERVAL_PENDING_NOTE = "ℹ️ Changes will apply when messaging starts"
+_INVALID_INTERVAL_TMPL = (
+    "❌ <b>Invalid Interval</b>\n\n"
+    "Error: {error}\n\n"
+    "Please provide a number ≥ 1"
+).format
+_ADD_GROUP_USAGE_MSG = (
+    "👥 <b>Add Group</b>\n\n"
+    "Usage: <code>/add_group [group_id]</code>\n"
+    "Example: <code>/add_group -1001234567890</code>\n\n"
+    "💡 Tip: Forward a message from the target group to get its ID"
+)
+_GROUP_EXISTS_TMPL = (
+    "⚠️ <b>Group Already Added</b>\n\n"
+    "Group <code>{gid}</code> is already in the list"
+).format
+_GROUP_ADDED_TMPL = (
+    "✅ <b>Group Added</b>\n\n"
+    "Group ID: <code>{gid}</code>\n"
+    "Total groups: {ng}"
+).format
+_INVALID_GROUP_MSG = (
+    "❌ <b>Invalid Group ID</b>\n\n"
+    "Please provide a valid group ID (negative number)\n"
+    "Example: <code>-1001234567890</code>"
+)
+_NO_GROUPS_TO_REMOVE_MSG = (
+    "📭 <b>No Groups Configured</b>\n\n"
+    "No groups to remove. Use /add_group to add some."
+)
+_REMOVE_GROUP_USAGE_TMPL = (
+    "👥 <b>Remove Group</b>\n\n"
+    "Current groups:\n{groups}\n\n"
+    "Usage: <code>/remove_group [group_id]</code>"
+).format
+_GROUP_NOT_FOUND_TMPL = (
+    "❌ <b>Group Not Found</b>\n\n"
+    "Group <code>{gid}</code> is not in the list"
+).format
+_GROUP_REMOVED_TMPL = (
+    "✅ <b>Group Removed</b>\n\n"
+    "Group ID: <code>{gid}</code>\n"
+    "Remaining groups: {ng}"
+).format
+_NO_GROUPS_MSG = (
+    "📭 <b>No Groups Configured</b>\n\n"
+    "Use /add_group to add target groups for messaging."
+)
+_GROUPS_LIST_TMPL = (
+    "👥 <b>Configured Groups ({ng})</b>\n\n"
+    "{groups}\n\n"
+    "💡 Use /remove_group to remove groups"
+).format
+_SET_MESSAGE_USAGE_MSG = (
+    "💬 <b>Set Message</b>\n\n"
+    "Usage: <code>/set_message [your message]</code>\n"
+    "Example: <code>/set_message Hello everyone!</code>\n\n"
+    "💡 The message will replace current messages"
+)
+_MESSAGE_TOO_LONG_TMPL = (
+    "❌ <b>Message Too Long</b>\n\n"
+    "Message length: {length} characters\n"
+    "Maximum allowed: 4000 characters"
+).format
+_MESSAGE_UPDATED_TMPL = (
+    "✅ <b>Message Updated</b>\n\n"
+    "Preview: <i>{preview}</i>\n\n"
+    "Length: {length} characters"
+).format
+_NO_MESSAGES_MSG = (
+    "📭 <b>No Messages Configured</b>\n\n"
+    "Use /set_message to configure a message."
+)
+_CURRENT_MESSAGE_TMPL = (
+    "💬 <b>Current Message</b>\n\n"
+    "<code>{message}</code>\n\n"
+    "Length: {length} characters"
+).format
+
 class BotController:
     """
     Remote control interface for Android TPMB via Telegram commands
@@ -15,6 +148,11 @@ class BotController:
     def __init__(self, bot_instance):
         self.bot = bot_instance
         self.logger = logging.getLogger(__name__)
+        # (groups object, formatted listing); groups are swapped, never mutated,
+        # on add/remove/reload, so identity tells whether the listing is current
+        self._listing_cache = (None, "")
+        # instance_name is fixed for the bot's lifetime
+        self._status_name = bot_instance.instance_name.upper()
         
     def _is_authorized(self, user_id: int) -> bool:
         """Check if user is authorized to control bot"""
@@ -22,86 +160,65 @@ class BotController:
         
     async def _deny_access(self, update: Update):
         """Deny access to unauthorized users"""
-        await update.message.reply_text(
-            "🚫 <b>Access Denied</b>\n\n"
-            "You are not authorized to control this bot.\n"
-            "Contact the bot owner to get access.",
-            parse_mode=ParseMode.HTML
-        )
+        await update.message.reply_text(_DENY_MSG, parse_mode=ParseMode.HTML)
         
     async def start_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Start bot messaging"""
         if not self._is_authorized(update.effective_user.id):
             return await self._deny_access(update)
             
-        if self.bot.messaging_active:
-            await update.message.reply_text(
-                "✅ <b>Already Running</b>\n\n"
-                f"Bot is already sending messages every {self.bot.interval_minutes} minutes.",
-                parse_mode=ParseMode.HTML
-            )
+        reply = partial(update.message.reply_text, parse_mode=ParseMode.HTML)
+        
+        bot = self.bot
+        if bot.messaging_active:
+            await reply(_ALREADY_RUNNING_TMPL(iv=bot.interval_minutes))
             return
             
-        await self.bot.start_messaging()
-        await update.message.reply_text(
-            "🚀 <b>Bot Started</b>\n\n"
-            f"✅ Messaging activated\n"
-            f"⏱️ Interval: {self.bot.interval_minutes} minutes\n"
-            f"👥 Groups: {len(self.bot.groups)}\n"
-            f"💬 Messages: {len(self.bot.messages)}",
-            parse_mode=ParseMode.HTML
-        )
+        await bot.start_messaging()
+        await reply(_STARTED_TMPL(iv=bot.interval_minutes, ng=len(bot.groups), nm=len(bot.messages)))
         
     async def stop_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Stop bot messaging"""
         if not self._is_authorized(update.effective_user.id):
             return await self._deny_access(update)
             
+        reply = partial(update.message.reply_text, parse_mode=ParseMode.HTML)
+        
         if not self.bot.messaging_active:
-            await update.message.reply_text(
-                "⏹️ <b>Already Stopped</b>\n\n"
-                "Bot messaging is not currently active.",
-                parse_mode=ParseMode.HTML
-            )
+            await reply(_ALREADY_STOPPED_MSG)
             return
             
         await self.bot.stop_messaging()
-        await update.message.reply_text(
-            "⏹️ <b>Bot Stopped</b>\n\n"
-            "✅ Messaging deactivated\n"
-            "ℹ️ Use /start_bot to resume",
-            parse_mode=ParseMode.HTML
-        )
+        await reply(_STOPPED_MSG)
         
     async def status_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Get bot status"""
         if not self._is_authorized(update.effective_user.id):
             return await self._deny_access(update)
             
-        status_emoji = "🟢" if self.bot.messaging_active else "🔴"
-        status_text = "ACTIVE" if self.bot.messaging_active else "STOPPED"
+        reply = partial(update.message.reply_text, parse_mode=ParseMode.HTML)
+        
+        bot = self.bot
+        active = bot.messaging_active
+        status_emoji = "🟢" if active else "🔴"
+        status_text = "ACTIVE" if active else "STOPPED"
         
-        # Get last message time if available
+        # Get next message time if available
         last_msg_info = ""
-        if hasattr(self.bot.scheduler, 'get_job'):
-            try:
-                job = self.bot.scheduler.get_job(f'messaging_{self.bot.instance_name}')
-                if job and job.next_run_time:
-                    last_msg_info = f"🕐 Next message: {job.next_run_time.strftime('%H:%M:%S')}\n"
-            except:
-                pass
-                
-        await update.message.reply_text(
-            f"📊 <b>Bot Status - {self.bot.instance_name.upper()}</b>\n\n"
-            f"{status_emoji} Status: <b>{status_text}</b>\n"
-            f"⏱️ Interval: {self.bot.interval_minutes} minutes\n"
-            f"👥 Groups: {len(self.bot.groups)}\n" 
-            f"💬 Messages: {len(self.bot.messages)}\n"
-            f"{last_msg_info}"
-            f"🔒 Security: ENABLED\n"
-            f"📱 Platform: Android\n"
-            f"🌐 TLS: ENFORCED",
-            parse_mode=ParseMode.HTML
+        next_time = bot.next_message_time
+        if next_time:
+            last_msg_info = _NEXT_MESSAGE_TMPL(next_time)
+            
+        await reply(
+            _STATUS_TMPL(
+                name=self._status_name,
+                emoji=status_emoji,
+                status=status_text,
+                iv=bot.interval_minutes,
+                ng=len(bot.groups),
+                nm=len(bot.messages),
+                next_msg=last_msg_info
+            )
         )
         
     async def set_interval_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -109,14 +226,10 @@ class BotController:
         if not self._is_authorized(update.effective_user.id):
             return await self._deny_access(update)
             
+        reply = partial(update.message.reply_text, parse_mode=ParseMode.HTML)
+        
         if not context.args:
-            await update.message.reply_text(
-                "⏱️ <b>Set Interval</b>\n\n"
-                f"Current interval: <b>{self.bot.interval_minutes} minutes</b>\n\n"
-                "Usage: <code>/set_interval [minutes]</code>\n"
-                "Example: <code>/set_interval 5</code>",
-                parse_mode=ParseMode.HTML
-            )
+            await reply(_INTERVAL_USAGE_TMPL(iv=self.bot.interval_minutes))
             return
             
         try:
@@ -125,189 +238,149 @@ class BotController:
                 raise ValueError("Interval must be at least 1 minute")
                 
             old_interval = self.bot.interval_minutes
-            self.bot.interval_minutes = minutes
+            self.bot.set_interval(minutes)
             
             # Update running job if active
             if self.bot.messaging_active:
                 await self.bot.stop_messaging()
                 await self.bot.start_messaging()
                 
-            # Save configuration
-            self.bot.save_config()
-            
-            await update.message.reply_text(
-                f"✅ <b>Interval Updated</b>\n\n"
-                f"Previous: {old_interval} minutes\n"
-                f"New: <b>{minutes} minutes</b>\n\n"
-                f"{'🔄 Messaging restarted with new interval' if self.bot.messaging_active else 'ℹ️ Changes will apply when messaging starts'}",
-                parse_mode=ParseMode.HTML
+            # Save off the event loop while the reply is in flight
+            await asyncio.gather(
+                asyncio.to_thread(self.bot.save_config),
+                reply(
+                    _INTERVAL_UPDATED_TMPL(
+                        old=old_interval,
+                        new=minutes,
+                        note=_INTERVAL_RESTARTED_NOTE if self.bot.messaging_active else _INTERVAL_PENDING_NOTE
+                    )
+                )
             )
             
         except ValueError as e:
-            await update.message.reply_text(
-                f"❌ <b>Invalid Interval</b>\n\n"
-                f"Error: {str(e)}\n\n"
-                "Please provide a number ≥ 1",
-                parse_mode=ParseMode.HTML
-            )
+            await reply(_INVALID_INTERVAL_TMPL(error=e))
             
     async def add_group_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Add group to messaging list"""
         if not self._is_authorized(update.effective_user.id):
             return await self._deny_access(update)
             
+        reply = partial(update.message.reply_text, parse_mode=ParseMode.HTML)
+        
         if not context.args:
-            await update.message.reply_text(
-                "👥 <b>Add Group</b>\n\n"
-                "Usage: <code>/add_group [group_id]</code>\n"
-                "Example: <code>/add_group -1001234567890</code>\n\n"
-                "💡 Tip: Forward a message from the target group to get its ID",
-                parse_mode=ParseMode.HTML
-            )
+            await reply(_ADD_GROUP_USAGE_MSG)
             return
             
         try:
             group_id = context.args[0]
             
-            # Validate it's a negative number (group ID format)
-            if not (group_id.startswith('-') and group_id[1:].isdigit()):
+            # Same strict format check as groups.txt; int() alone accepts "-0100", " -1", "-1_0"
+            if not self.bot._validate_group_id(group_id):
                 raise ValueError("Group ID must be negative number")
+            gid = int(group_id)
                 
-            if group_id in self.bot.groups:
-                await update.message.reply_text(
-                    f"⚠️ <b>Group Already Added</b>\n\n"
-                    f"Group <code>{group_id}</code> is already in the list",
-                    parse_mode=ParseMode.HTML
-                )
+            if self.bot.has_group(gid):
+                await reply(_GROUP_EXISTS_TMPL(gid=gid))
                 return
                 
-            self.bot.groups.append(group_id)
-            self.bot.save_config()
-            
-            await update.message.reply_text(
-                f"✅ <b>Group Added</b>\n\n"
-                f"Group ID: <code>{group_id}</code>\n"
-                f"Total groups: {len(self.bot.groups)}",
-                parse_mode=ParseMode.HTML
+            self.bot.add_group(gid)
+            # Save off the event loop while the reply is in flight
+            await asyncio.gather(
+                asyncio.to_thread(self.bot.save_config),
+                reply(_GROUP_ADDED_TMPL(gid=gid, ng=len(self.bot.groups)))
             )
             
         except (ValueError, IndexError):
-            await update.message.reply_text(
-                "❌ <b>Invalid Group ID</b>\n\n"
-                "Please provide a valid group ID (negative number)\n"
-                "Example: <code>-1001234567890</code>",
-                parse_mode=ParseMode.HTML
-            )
+            await reply(_INVALID_GROUP_MSG)
             
     async def remove_group_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Remove group from messaging list"""
         if not self._is_authorized(update.effective_user.id):
             return await self._deny_access(update)
             
+        reply = partial(update.message.reply_text, parse_mode=ParseMode.HTML)
+        
         if not context.args:
             if not self.bot.groups:
-                await update.message.reply_text(
-                    "📭 <b>No Groups Configured</b>\n\n"
-                    "No groups to remove. Use /add_group to add some.",
-                    parse_mode=ParseMode.HTML
-                )
+                await reply(_NO_GROUPS_TO_REMOVE_MSG)
                 return
                 
             groups_list = "\n".join([f"• <code>{g}</code>" for g in self.bot.groups])
-            await update.message.reply_text(
-                f"👥 <b>Remove Group</b>\n\n"
-                f"Current groups:\n{groups_list}\n\n"
-                f"Usage: <code>/remove_group [group_id]</code>",
-                parse_mode=ParseMode.HTML
-            )
+            await reply(_REMOVE_GROUP_USAGE_TMPL(groups=groups_list))
             return
             
+        group_id = context.args[0]
+        
+        # A malformed ID can't be in the list; escape it since replies are HTML
+        if not self.bot._validate_group_id(group_id):
+            await reply(_GROUP_NOT_FOUND_TMPL(gid=html.escape(group_id)))
+            return
+        gid = int(group_id)
+        
         try:
-            group_id = context.args[0]
-            
-            if group_id not in self.bot.groups:
-                await update.message.reply_text(
-                    f"❌ <b>Group Not Found</b>\n\n"
-                    f"Group <code>{group_id}</code> is not in the list",
-                    parse_mode=ParseMode.HTML
-                )
-                return
-                
-            self.bot.groups.remove(group_id)
-            self.bot.save_config()
-            
-            await update.message.reply_text(
-                f"✅ <b>Group Removed</b>\n\n"
-                f"Group ID: <code>{group_id}</code>\n"
-                f"Remaining groups: {len(self.bot.groups)}",
-                parse_mode=ParseMode.HTML
-            )
+            # remove_group() does the membership check
+            self.bot.remove_group(gid)
+        except ValueError:
+            await reply(_GROUP_NOT_FOUND_TMPL(gid=gid))
+            return
             
-        except IndexError:
-            await update.message.reply_text(
-                "❌ <b>Missing Group ID</b>\n\n"
-                "Please specify which group to remove",
-                parse_mode=ParseMode.HTML
-            )
+        # Save off the event loop while the reply is in flight
+        await asyncio.gather(
+            asyncio.to_thread(self.bot.save_config),
+            reply(_GROUP_REMOVED_TMPL(gid=gid, ng=len(self.bot.groups)))
+        )
             
     async def list_groups_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """List all configured groups"""
         if not self._is_authorized(update.effective_user.id):
             return await self._deny_access(update)
             
+        reply = partial(update.message.reply_text, parse_mode=ParseMode.HTML)
+        
         if not self.bot.groups:
-            await update.message.reply_text(
-                "📭 <b>No Groups Configured</b>\n\n"
-                "Use /add_group to add target groups for messaging.",
-                parse_mode=ParseMode.HTML
-            )
+            await reply(_NO_GROUPS_MSG)
             return
             
-        groups_list = "\n".join([f"{i+1}. <code>{group}</code>" for i, group in enumerate(self.bot.groups)])
-        
-        await update.message.reply_text(
-            f"👥 <b>Configured Groups ({len(self.bot.groups)})</b>\n\n"
-            f"{groups_list}\n\n"
-            f"💡 Use /remove_group to remove groups",
-            parse_mode=ParseMode.HTML
-        )
+        groups = self.bot.groups
+        cached_groups, groups_list = self._listing_cache
+        if cached_groups is not groups:
+            groups_list = "\n".join([f"{i+1}. <code>{group}</code>" for i, group in enumerate(groups)])
+            self._listing_cache = (groups, groups_list)
+            
+        await reply(_GROUPS_LIST_TMPL(ng=len(groups), groups=groups_list))
         
     async def set_message_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Set bot message"""
         if not self._is_authorized(update.effective_user.id):
             return await self._deny_access(update)
             
+        reply = partial(update.message.reply_text, parse_mode=ParseMode.HTML)
+        
         if not context.args:
-            await update.message.reply_text(
-                "💬 <b>Set Message</b>\n\n"
-                "Usage: <code>/set_message [your message]</code>\n"
-                "Example: <code>/set_message Hello everyone!</code>\n\n"
-                "💡 The message will replace current messages",
-                parse_mode=ParseMode.HTML
-            )
+            await reply(_SET_MESSAGE_USAGE_MSG)
             return
             
-        new_message = ' '.join(context.args)
+        # Raw text after the command keeps the user's spacing
+        raw_message = update.message.text.split(None, 1)[1]
         
-        if len(new_message) > 4000:  # Telegram limit
-            await update.message.reply_text(
-                "❌ <b>Message Too Long</b>\n\n"
-                f"Message length: {len(new_message)} characters\n"
-                "Maximum allowed: 4000 characters",
-                parse_mode=ParseMode.HTML
-            )
+        # Reject oversized pastes before doing any more work on them
+        # (normalizing line breaks below never makes the text longer)
+        if len(raw_message) > 4000:  # Telegram limit
+            await reply(_MESSAGE_TOO_LONG_TMPL(length=len(raw_message)))
             return
             
-        self.bot.messages = [new_message]
-        self.bot.save_config()
+        # Messages are stored one per line, so any line breaks become single spaces
+        new_message = ' '.join(raw_message.splitlines())
+        length = len(new_message)
+        
+        self.bot.set_messages([new_message])
         
-        preview = new_message[:100] + "..." if len(new_message) > 100 else new_message
+        preview = f"{new_message[:100]}…" if length > 100 else new_message
         
-        await update.message.reply_text(
-            f"✅ <b>Message Updated</b>\n\n"
-            f"Preview: <i>{preview}</i>\n\n"
-            f"Length: {len(new_message)} characters",
-            parse_mode=ParseMode.HTML
+        # Save off the event loop while the reply is in flight
+        await asyncio.gather(
+            asyncio.to_thread(self.bot.save_config),
+            reply(_MESSAGE_UPDATED_TMPL(preview=preview, length=length))
         )
         
     async def get_message_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -315,19 +388,13 @@ class BotController:
         if not self._is_authorized(update.effective_user.id):
             return await self._deny_access(update)
             
-        if not self.bot.messages:
-            await update.message.reply_text(
-                "📭 <b>No Messages Configured</b>\n\n"
-                "Use /set_message to configure a message.",
-                parse_mode=ParseMode.HTML
-            )
+        reply = partial(update.message.reply_text, parse_mode=ParseMode.HTML)
+        
+        msgs = self.bot.messages
+        if not msgs:
+            await reply(_NO_MESSAGES_MSG)
             return
             
-        current_message = self.bot.messages[0] if len(self.bot.messages) == 1 else "Multiple messages configured"
+        current_message = msgs[0] if len(msgs) == 1 else "Multiple messages configured"
         
-        await update.message.reply_text(
-            f"💬 <b>Current Message</b>\n\n"
-            f"<code>{current_message}</code>\n\n"
-            f"Length: {len(current_message)} characters",
-            parse_mode=ParseMode.HTML
-        )
+        await reply(_CURRENT_MESSAGE_TMPL(message=current_message, length=len(current_message)))
@@ -1,13 +1,40 @@
 import asyncio
+import atexit
 import json
 import os
+import re
+import shutil
 import signal
 import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Set
 import logging
 from datetime import datetime
 
+try:
+    import psutil
+except ImportError:
+    psutil = None  # Liveness falls back to os.kill; resource stats unavailable
+
+try:
+    import orjson
+except ImportError:
+    orjson = None  # Registry falls back to stdlib json
+
+# Instance names double as directory names: 1-50 of [A-Za-z0-9_-]
+_INSTANCE_NAME_RE = re.compile(r'[a-zA-Z0-9_-]{1,50}\Z')
+
+def _json_dumps(obj) -> bytes:
+    """Serialize to compact UTF-8 JSON bytes, using orjson when available"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+_json_loads = orjson.loads if orjson is not None else json.loads
+
 class MultiInstanceManager:
     """
     Advanced multi-instance manager for Android TPMB:
@@ -27,40 +54,162 @@ class MultiInstanceManager:
         
         # Mobile optimization settings
         self.max_concurrent_instances = 5  # Limit for mobile devices
-        self.health_check_interval = 300  # 5 minutes
+        self.health_check_interval = 300  # 5 minutes; adapts between the bounds below
+        self.min_health_check_interval = 60  # After a status change
+        self.max_health_check_interval = 1800  # Ceiling while everything is stable
         self.cleanup_interval = 600  # 10 minutes
+        self.flush_interval = 5.0  # Min seconds between deferred registry writes
+        self.status_ttl = 2.0  # Seconds a process liveness check stays valid
+        self._status_cache: Dict[str, tuple] = {}
+        self._proc_cache: Dict[int, 'psutil.Process'] = {}
+        self._last_statuses: Optional[Dict[str, str]] = None
         
-        # Instance registry file
+        # Instance registry: a JSON snapshot plus an append-only log of
+        # per-instance changes made since that snapshot
         self.registry_file = self.base_dir / 'registry.json'
+        self.registry_log = self.base_dir / 'registry.log'
+        self._dirty: Set[str] = set()
+        self._last_flush = 0.0
+        self._seq = 0
+        self._log_records = 0
+        self._log_fd: Optional[int] = None  # registry.log, opened O_APPEND on first write
+        # Guards instances, the dirty set and flushes: health passes and
+        # stop_instance_async run in worker threads alongside the event loop
+        self._lock = threading.RLock()
         self._load_registry()
         
+        # Deferred registry changes must not be lost on exit
+        atexit.register(self.close)
+        
+    def close(self):
+        """Flush pending registry changes and release the registry log"""
+        with self._lock:
+            self._flush_if_dirty()
+            if self._log_fd is not None:
+                os.close(self._log_fd)
+                self._log_fd = None
+        
     def _load_registry(self):
-        """Load instance registry from file"""
+        """Load instance registry snapshot and replay the change log"""
         try:
             if self.registry_file.exists():
-                with open(self.registry_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
+                with open(self.registry_file, 'rb') as f:
+                    data = _json_loads(f.read())
                     self.instances = data.get('instances', {})
-                    self.logger.info(f"Loaded {len(self.instances)} instances from registry")
+                    self._seq = data.get('seq', 0)
+                    
+            snapshot_seq = self._seq
+            try:
+                with open(self.registry_log, 'rb') as f:
+                    for line in f:
+                        self._log_records += 1
+                        try:
+                            record = _json_loads(line)
+                        except ValueError:
+                            continue  # Torn write at the tail
+                        # Records already folded into the snapshot are skipped
+                        if record.get('seq', 0) <= snapshot_seq:
+                            continue
+                        self._seq = record['seq']
+                        if record.get('op') == 'delete':
+                            self.instances.pop(record['name'], None)
+                        else:
+                            self.instances[record['name']] = record['data']
+            except FileNotFoundError:
+                pass
+                
+            self.logger.info(f"Loaded {len(self.instances)} instances from registry")
         except Exception as e:
             self.logger.error(f"Failed to load registry: {e}")
             self.instances = {}
             
-    def _save_registry(self):
-        """Save instance registry to file"""
-        try:
-            registry_data = {
-                'instances': self.instances,
-                'last_updated': datetime.now().isoformat(),
-                'manager_version': '2.0'
-            }
-            
-            with open(self.registry_file, 'w', encoding='utf-8') as f:
-                json.dump(registry_data, f, indent=2, ensure_ascii=False)
+    def _save_registry(self, *names: str, flush: bool = False):
+        """Mark instances changed; written at most once per flush_interval unless flush is set"""
+        with self._lock:
+            self._dirty.update(names)
+            if flush:
+                self._flush_registry()
+            else:
+                self._maybe_flush()
                 
-        except Exception as e:
-            self.logger.error(f"Failed to save registry: {e}")
+    def _maybe_flush(self):
+        """Write the registry if it is dirty and the flush interval has elapsed"""
+        with self._lock:
+            if self._dirty and time.monotonic() - self._last_flush >= self.flush_interval:
+                self._flush_registry()
+                
+    def _flush_if_dirty(self):
+        """Write any pending registry changes"""
+        with self._lock:
+            if self._dirty:
+                self._flush_registry()
+                
+    def _flush_registry(self):
+        """Append pending changes to the registry log, compacting it into the snapshot when it grows"""
+        with self._lock:
+            try:
+                # Compact once the log outgrows the registry itself
+                if self._log_records + len(self._dirty) > max(8, 2 * len(self.instances)):
+                    self._write_snapshot()
+                elif self._dirty:
+                    self._append_log()
+                    
+                self._dirty.clear()
+                self._last_flush = time.monotonic()
+                
+            except Exception as e:
+                self.logger.error(f"Failed to save registry: {e}")
             
+    def _append_log(self):
+        """Append one record per changed instance to registry.log"""
+        lines = []
+        for name in self._dirty:
+            self._seq += 1
+            data = self.instances.get(name)
+            if data is None:
+                record = {'seq': self._seq, 'op': 'delete', 'name': name}
+            else:
+                record = {'seq': self._seq, 'op': 'upsert', 'name': name, 'data': data}
+            lines.append(_json_dumps(record) + b'\n')
+            
+        # Kept open for the manager's lifetime: no open/close per flush
+        if self._log_fd is None:
+            self._log_fd = os.open(self.registry_log, os.O_RDWR | os.O_APPEND | os.O_CREAT, 0o600)
+            # A crash mid-write leaves a partial last line; start on a fresh one
+            # so replay does not drop our first record along with it
+            size = os.fstat(self._log_fd).st_size
+            if size and os.pread(self._log_fd, 1, size - 1) != b'\n':
+                lines.insert(0, b'\n')
+                
+        data = memoryview(b''.join(lines))
+        while data:
+            data = data[os.write(self._log_fd, data):]
+        os.fsync(self._log_fd)
+        self._log_records += len(lines)
+        
+    def _write_snapshot(self):
+        """Rewrite registry.json with all instances and truncate the log"""
+        registry_data = {
+            'instances': self.instances,
+            'seq': self._seq,
+            'last_updated': datetime.now().isoformat(),
+            'manager_version': '2.0'
+        }
+        
+        tmp_file = self.registry_file.with_suffix('.json.tmp')
+        with open(tmp_file, 'wb') as f:
+            f.write(_json_dumps(registry_data))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, self.registry_file)
+        
+        # Stale log records are ignored by seq, so a crash before this is harmless
+        if self._log_fd is not None:
+            os.ftruncate(self._log_fd, 0)  # O_APPEND: later writes start at offset 0
+        else:
+            open(self.registry_log, 'w').close()
+        self._log_records = 0
+        
     def create_instance(self, instance_name: str, config: dict = None) -> bool:
         """Create a new bot instance with configuration"""
         try:
@@ -98,8 +247,9 @@ class MultiInstanceManager:
             }
             
             # Save instance config
-            self.instances[instance_name] = default_config
-            self._save_registry()
+            with self._lock:
+                self.instances[instance_name] = default_config
+                self._save_registry(instance_name, flush=True)
             
             # Create initial configuration files
             self._create_initial_config(config_dir, default_config)
@@ -113,30 +263,26 @@ class MultiInstanceManager:
             
     def _validate_instance_name(self, name: str) -> bool:
         """Validate instance name for filesystem compatibility"""
-        if not name or len(name) < 1 or len(name) > 50:
-            return False
-            
         # Allow alphanumeric, dash, underscore
-        import re
-        return re.match(r'^[a-zA-Z0-9_-]+$', name) is not None
+        return bool(name) and _INSTANCE_NAME_RE.match(name) is not None
         
     def _create_initial_config(self, config_dir: Path, instance_config: dict):
         """Create initial configuration files for new instance"""
         try:
             # Create settings.txt
-            settings_file = config_dir / 'settings.txt'
-            with open(settings_file, 'w', encoding='utf-8') as f:
-                f.write(f"interval_minutes={instance_config['interval_minutes']}\n")
-                f.write(f"admin_ids={','.join(map(str, instance_config['admin_ids']))}\n")
-                
+            settings = (
+                f"interval_minutes={instance_config['interval_minutes']}\n"
+                f"admin_ids={','.join(map(str, instance_config['admin_ids']))}\n"
+            )
+            (config_dir / 'settings.txt').write_bytes(settings.encode('utf-8'))
+            
             # Create empty groups.txt
             groups_file = config_dir / 'groups.txt'
             groups_file.touch()
             
             # Create default messages.txt
-            messages_file = config_dir / 'messages.txt'
-            with open(messages_file, 'w', encoding='utf-8') as f:
-                f.write(f"Hello from {instance_config['name']}!\n")
+            messages = f"Hello from {instance_config['name']}!\n"
+            (config_dir / 'messages.txt').write_bytes(messages.encode('utf-8'))
                 
         except Exception as e:
             self.logger.error(f"Failed to create initial config: {e}")
@@ -162,12 +308,13 @@ class MultiInstanceManager:
             # Remove instance directory
             instance_dir = self.base_dir / instance_name
             if instance_dir.exists():
-                import shutil
                 shutil.rmtree(instance_dir)
                 
             # Remove from registry
-            del self.instances[instance_name]
-            self._save_registry()
+            with self._lock:
+                del self.instances[instance_name]
+                self._status_cache.pop(instance_name, None)
+                self._save_registry(instance_name, flush=True)
             
             self.logger.info(f"Instance '{instance_name}' deleted successfully")
             return True
@@ -181,12 +328,10 @@ class MultiInstanceManager:
         instances_list = []
         
         for name, config in self.instances.items():
-            instance_info = config.copy()
-            instance_info['name'] = name
-            
             # Check actual status
             actual_status = self._check_instance_status(name)
-            instance_info['actual_status'] = actual_status
+            # Built in one go: callers get their own dict, the registry is never shared
+            instance_info = {**config, 'name': name, 'actual_status': actual_status}
             
             # Get resource usage if running
             if actual_status == 'running':
@@ -197,7 +342,18 @@ class MultiInstanceManager:
         return instances_list
         
     def _check_instance_status(self, instance_name: str) -> str:
-        """Check actual status of instance process"""
+        """Check actual status of instance process (cached for status_ttl seconds)"""
+        now = time.monotonic()
+        cached = self._status_cache.get(instance_name)
+        if cached is not None and now - cached[0] < self.status_ttl:
+            return cached[1]
+            
+        status = self._probe_instance_status(instance_name)
+        self._status_cache[instance_name] = (now, status)
+        return status
+        
+    def _probe_instance_status(self, instance_name: str) -> str:
+        """Check whether the instance process is alive"""
         try:
             instance_info = self.instances.get(instance_name)
             if not instance_info:
@@ -207,21 +363,44 @@ class MultiInstanceManager:
             if not pid:
                 return 'stopped'
                 
-            # Check if process exists
-            try:
-                os.kill(pid, 0)  # Signal 0 just checks existence
+            if self._is_alive(pid):
                 return 'running'
-            except (OSError, ProcessLookupError):
-                # Process doesn't exist, update registry
+                
+            # Process doesn't exist, update registry
+            self._proc_cache.pop(pid, None)
+            with self._lock:
                 instance_info['status'] = 'stopped'
                 instance_info['pid'] = None
-                self._save_registry()
-                return 'stopped'
-                
+                self._save_registry(instance_name)
+            return 'stopped'
+            
         except Exception as e:
             self.logger.error(f"Error checking status for '{instance_name}': {e}")
             return 'error'
             
+    def _get_process(self, pid: int) -> 'psutil.Process':
+        """Return a cached psutil.Process so /proc handles and CPU samples are reused"""
+        proc = self._proc_cache.get(pid)
+        if proc is None:
+            proc = self._proc_cache[pid] = psutil.Process(pid)
+        return proc
+        
+    def _is_alive(self, pid: int) -> bool:
+        """Check whether pid is a live (non-zombie) process"""
+        if psutil is None:
+            try:
+                os.kill(pid, 0)  # Signal 0 just checks existence
+                return True
+            except (OSError, ProcessLookupError):
+                return False
+                
+        try:
+            # is_running() also detects a recycled pid via the creation time
+            proc = self._get_process(pid)
+            return proc.is_running() and proc.status() != psutil.STATUS_ZOMBIE
+        except psutil.Error:
+            return False
+            
     def _get_instance_resources(self, instance_name: str) -> dict:
         """Get resource usage for running instance"""
         try:
@@ -232,20 +411,25 @@ class MultiInstanceManager:
                 return {}
                 
             # Basic resource info (Android-compatible)
-            try:
-                import psutil
-                process = psutil.Process(pid)
-                
-                return {
-                    'cpu_percent': process.cpu_percent(),
-                    'memory_mb': process.memory_info().rss / 1024 / 1024,
-                    'threads': process.num_threads(),
-                    'status': process.status()
-                }
-            except ImportError:
+            if psutil is None:
                 # Fallback without psutil
                 return {'status': 'running', 'monitoring': 'limited'}
                 
+            # Reusing the Process object makes cpu_percent() measure since the last call;
+            # as_dict() reads all fields inside one oneshot() /proc pass
+            stats = self._get_process(pid).as_dict(
+                attrs=['cpu_percent', 'memory_info', 'num_threads', 'status'],
+                ad_value=None
+            )
+            memory_info = stats['memory_info']
+            
+            return {
+                'cpu_percent': stats['cpu_percent'],
+                'memory_mb': memory_info.rss / 1024 / 1024 if memory_info else None,
+                'threads': stats['num_threads'],
+                'status': stats['status']
+            }
+            
         except Exception as e:
             self.logger.debug(f"Could not get resources for '{instance_name}': {e}")
             return {}
@@ -255,9 +439,11 @@ class MultiInstanceManager:
         if instance_name not in self.instances:
             return None
             
-        info = self.instances[instance_name].copy()
-        info['name'] = instance_name
-        info['actual_status'] = self._check_instance_status(instance_name)
+        info = {
+            **self.instances[instance_name],
+            'name': instance_name,
+            'actual_status': self._check_instance_status(instance_name)
+        }
         
         # Add directory info
         instance_dir = self.base_dir / instance_name
@@ -265,10 +451,14 @@ class MultiInstanceManager:
         info['directory_exists'] = instance_dir.exists()
         
         # Add log info
-        logs_dir = instance_dir / 'logs'
-        if logs_dir.exists():
-            log_files = list(logs_dir.glob('*.log'))
-            info['log_files'] = [str(f) for f in log_files]
+        try:
+            with os.scandir(instance_dir / 'logs') as entries:
+                info['log_files'] = [
+                    e.path for e in entries
+                    if e.name.endswith('.log') and e.is_file(follow_symlinks=False)
+                ]
+        except FileNotFoundError:
+            pass
             
         return info
         
@@ -289,15 +479,8 @@ class MultiInstanceManager:
             try:
                 os.kill(pid, signal.SIGTERM)
                 
-                # Wait for graceful shutdown
-                import time
-                for _ in range(10):  # Wait up to 10 seconds
-                    try:
-                        os.kill(pid, 0)
-                        time.sleep(1)
-                    except (OSError, ProcessLookupError):
-                        break
-                else:
+                # Wait up to 10 seconds for graceful shutdown
+                if not self._wait_for_exit(pid, 10):
                     # Force kill if still running
                     self.logger.warning(f"Force killing instance '{instance_name}'")
                     os.kill(pid, signal.SIGKILL)
@@ -305,28 +488,85 @@ class MultiInstanceManager:
             except (OSError, ProcessLookupError):
                 pass  # Process already dead
                 
-            # Update registry
-            instance_info['status'] = 'stopped'
-            instance_info['pid'] = None
-            instance_info['stopped_at'] = datetime.now().isoformat()
-            self._save_registry()
-            
-            self.logger.info(f"Instance '{instance_name}' stopped")
+            self._mark_stopped(instance_name, pid)
             return True
             
         except Exception as e:
             self.logger.error(f"Failed to stop instance '{instance_name}': {e}")
             return False
             
+    def _mark_stopped(self, instance_name: str, pid: int):
+        """Record a stopped instance in the registry and drop its cached process state"""
+        self._proc_cache.pop(pid, None)
+        with self._lock:
+            instance_info = self.instances[instance_name]
+            instance_info['status'] = 'stopped'
+            instance_info['pid'] = None
+            instance_info['stopped_at'] = datetime.now().isoformat()
+            self._status_cache.pop(instance_name, None)
+            self._save_registry(instance_name)
+        
+        self.logger.info(f"Instance '{instance_name}' stopped")
+            
+    def _wait_for_exit(self, pid: int, timeout: float) -> bool:
+        """Wait until pid exits; False if it is still alive after timeout"""
+        if psutil is not None:
+            try:
+                self._get_process(pid).wait(timeout=timeout)
+            except psutil.TimeoutExpired:
+                return False
+            except psutil.Error:
+                pass  # Already gone
+            return True
+            
+        # Poll with exponential backoff so fast shutdowns return in milliseconds
+        deadline = time.monotonic() + timeout
+        delay = 0.01
+        while self._is_alive(pid):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            time.sleep(min(delay, remaining))
+            delay = min(delay * 2, 0.5)
+        return True
+        
+    async def stop_instance_async(self, instance_name: str) -> bool:
+        """Stop an instance without blocking the event loop"""
+        return await asyncio.to_thread(self.stop_instance, instance_name)
+        
     def stop_all_instances(self) -> int:
         """Stop all running instances"""
-        stopped_count = 0
+        running = [
+            (name, self.instances[name]['pid'])
+            for name in list(self.instances.keys())
+            if self._check_instance_status(name) == 'running'
+        ]
         
-        for instance_name in list(self.instances.keys()):
-            if self._check_instance_status(instance_name) == 'running':
-                if self.stop_instance(instance_name):
-                    stopped_count += 1
-                    
+        # Signal every instance first so they shut down in parallel
+        for instance_name, pid in running:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except (OSError, ProcessLookupError):
+                pass  # Process already dead
+                
+        # One shared 10 second deadline: total wait is the slowest instance, not the sum
+        deadline = time.monotonic() + 10
+        stopped_count = 0
+        for instance_name, pid in running:
+            try:
+                if not self._wait_for_exit(pid, max(0.0, deadline - time.monotonic())):
+                    self.logger.warning(f"Force killing instance '{instance_name}'")
+                    os.kill(pid, signal.SIGKILL)
+            except (OSError, ProcessLookupError):
+                pass  # Process already dead
+            except Exception as e:
+                self.logger.error(f"Failed to stop instance '{instance_name}': {e}")
+                continue
+                
+            self._mark_stopped(instance_name, pid)
+            stopped_count += 1
+            
+        self._flush_if_dirty()
         self.logger.info(f"Stopped {stopped_count} instances")
         return stopped_count
         
@@ -336,21 +576,42 @@ class MultiInstanceManager:
             try:
                 await asyncio.sleep(self.health_check_interval)
                 
-                for instance_name in list(self.instances.keys()):
-                    status = self._check_instance_status(instance_name)
-                    
-                    if status == 'error':
-                        self.logger.warning(f"Instance '{instance_name}' in error state")
-                        
-                    # Update registry with current status
-                    if instance_name in self.instances:
-                        self.instances[instance_name]['last_checked'] = datetime.now().isoformat()
-                        
-                self._save_registry()
+                # Liveness probes and the registry write are blocking; keep them off the event loop
+                changed = await asyncio.to_thread(self._do_health_pass)
                 
+                # Check often right after a change, back off while instances are stable
+                if changed:
+                    self.health_check_interval = self.min_health_check_interval
+                else:
+                    self.health_check_interval = min(
+                        self.health_check_interval * 1.5, self.max_health_check_interval
+                    )
+                    
             except Exception as e:
                 self.logger.error(f"Health check error: {e}")
                 
+    def _do_health_pass(self) -> bool:
+        """Check every instance once and record the check time; True if any status changed"""
+        statuses = {}
+        for instance_name in list(self.instances.keys()):
+            status = statuses[instance_name] = self._check_instance_status(instance_name)
+            
+            if status == 'error':
+                self.logger.warning(f"Instance '{instance_name}' in error state")
+                
+        # Probes above may block; only the registry update holds the lock
+        checked_at = datetime.now().isoformat()
+        with self._lock:
+            for instance_name in statuses:
+                if instance_name in self.instances:
+                    self.instances[instance_name]['last_checked'] = checked_at
+            self._save_registry(*statuses.keys() & self.instances.keys())
+        
+        # The first pass only sets the baseline
+        changed = self._last_statuses is not None and statuses != self._last_statuses
+        self._last_statuses = statuses
+        return changed
+        
     def get_summary(self) -> dict:
         """Get summary of all instances"""
         summary = {
@@ -378,17 +639,29 @@ class MultiInstanceManager:
         cleaned_count = 0
         
         try:
-            if not self.base_dir.exists():
+            known = set(self.instances)
+            with os.scandir(self.base_dir) as entries:
+                orphans = [
+                    e for e in entries
+                    if e.is_dir(follow_symlinks=False) and e.name not in known
+                ]
+                
+            if not orphans:
                 return 0
                 
-            for item in self.base_dir.iterdir():
-                if item.is_dir() and item.name not in self.instances:
-                    if item.name != 'registry.json':
-                        self.logger.info(f"Cleaning orphaned directory: {item.name}")
-                        import shutil
-                        shutil.rmtree(item)
+            # rmtree is I/O bound; remove the orphans in parallel
+            with ThreadPoolExecutor(max_workers=4) as pool:
+                futures = {pool.submit(shutil.rmtree, e.path): e.name for e in orphans}
+                for future, name in futures.items():
+                    try:
+                        future.result()
+                        self.logger.info(f"Cleaned orphaned directory: {name}")
                         cleaned_count += 1
+                    except OSError as e:
+                        self.logger.error(f"Failed to clean orphaned directory '{name}': {e}")
                         
+        except FileNotFoundError:
+            return 0
         except Exception as e:
             self.logger.error(f"Cleanup error: {e}")
             
@@ -2,20 +2,102 @@ import ssl
 import certifi
 import secrets
 import base64
+import hashlib
+import inspect
 import os
 import json
+import struct
 import time
 import re
+from functools import lru_cache
 from pathlib import Path
 from cryptography.fernet import Fernet
-from cryptography.hazmat.primitives import hashes
-from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
 import logging
 from typing import Optional, Dict
-import aiohttp
+import httpx
 from telegram import Bot
+from telegram.request import HTTPXRequest
 import asyncio
 
+try:
+    # Same signature and output as hashlib's, with precomputed HMAC pad states
+    from fastpbkdf2 import pbkdf2_hmac
+except ImportError:
+    from hashlib import pbkdf2_hmac
+
+# Hash part of a bot token: base64url-like characters, Telegram's length range
+_TOKEN_HASH_RE = re.compile(r'[A-Za-z0-9_-]{35,50}\Z')
+# Every byte outside [A-Za-z0-9_-], for bytes.translate(None, delete)
+_UNSAFE_NAME_BYTES = bytes(
+    b for b in range(256)
+    if not (chr(b).isascii() and (chr(b).isalnum() or chr(b) in '_-'))
+)
+# Long single-character runs never occur in real tokens
+_SUSPICIOUS_RUNS = tuple(char * 10 for char in '0123456789abcdef')
+
+# Encrypted token payload: format version + encrypted_at, then the KDF salt, then the token
+_TOKEN_HEADER = struct.Struct('<BQ')
+_TOKEN_FORMAT_VERSION = 2
+_SALT_SIZE = 32
+
+# AES-GCM envelope: marker byte, 96-bit nonce, ciphertext + tag (base64url as a whole).
+# The marker can't collide with Fernet's 0x80 version byte.
+_AEAD_MARKER = b'\x03'
+_NONCE_SIZE = 12
+
+# Hardened SSL context shared by every SecurityManager; it is never mutated
+# after creation, and building it parses the whole certifi CA bundle
+_shared_ssl_context: Optional[ssl.SSLContext] = None
+
+# One KDF salt per master key for the life of the process, so managers
+# sharing a master key also share the (cached) derived key
+_MASTER_KEY_SALTS: Dict[bytes, bytes] = {}
+
+@lru_cache(maxsize=16)
+def _derive_key(password: bytes, salt: bytes) -> bytes:
+    """Derive a raw 32-byte key with PBKDF2-HMAC-SHA256 (600k iterations); cached per (password, salt)"""
+    # C implementation either way; bit-identical to cryptography's PBKDF2HMAC
+    return pbkdf2_hmac(
+        'sha256',  # Use SHA256 instead of SHA1
+        password,
+        salt,
+        600000,  # OWASP 2024 recommendation (increased from 480k)
+        dklen=32
+    )
+
+# python-telegram-bot 21.6+ takes extra httpx.AsyncClient arguments publicly
+_HTTPX_KWARGS_SUPPORTED = 'httpx_kwargs' in inspect.signature(HTTPXRequest.__init__).parameters
+
+class SecureHTTPXRequest(HTTPXRequest):
+    """
+    HTTPXRequest that verifies TLS with the hardened SSL context,
+    ignores environment proxy settings and keeps idle connections alive
+    """
+    
+    def __init__(self, ssl_context: ssl.SSLContext, keepalive_expiry: float = 75.0, **kwargs):
+        pool_size = kwargs.get('connection_pool_size', 1)
+        client_kwargs = {
+            'verify': ssl_context,
+            'trust_env': False,  # Don't use environment proxy settings for security
+            # httpx drops idle connections after 5s by default, so every command reply
+            # after a pause would pay a fresh TCP + TLS handshake
+            'limits': httpx.Limits(
+                max_connections=pool_size,
+                max_keepalive_connections=pool_size,
+                keepalive_expiry=keepalive_expiry
+            )
+        }
+        
+        if _HTTPX_KWARGS_SUPPORTED:
+            super().__init__(httpx_kwargs=client_kwargs, **kwargs)
+        else:
+            # Older releases (e.g. the <21 Termux pin) only expose these privately;
+            # requirements cap the version range this path has to cover
+            super().__init__(**kwargs)
+            self._client_kwargs.update(client_kwargs)
+            self._client = self._build_client()
+
 class SecurityManager:
     """
     Enhanced security manager for Android TPMB with 2024 security standards:
@@ -29,12 +111,19 @@ class SecurityManager:
     def __init__(self, master_key: Optional[str] = None):
         self.logger = logging.getLogger(__name__)
         self.ssl_context = self._create_ssl_context()
-        self.master_key = master_key or self._generate_master_key()
+        # Kept as bytes: that's what PBKDF2 consumes; text only at the caller boundary
+        self.master_key = master_key.encode() if master_key else self._generate_master_key()
         self.cipher_suite = self._init_encryption()
-        self._rate_limiter = {}
+        self._rate_limiter: Dict[str, list] = {}  # operation -> [last_refill, tokens]
+        self._verified_at: Dict[str, float] = {}  # sha256(token) -> monotonic time of last successful get_me()
+        self.verify_ttl = 300  # Seconds a successful verification is trusted
         
     def _create_ssl_context(self) -> ssl.SSLContext:
-        """Create ultra-secure SSL context for Android with 2024 standards"""
+        """Create ultra-secure SSL context for Android with 2024 standards (once per process)"""
+        global _shared_ssl_context
+        if _shared_ssl_context is not None:
+            return _shared_ssl_context
+            
         context = ssl.create_default_context(cafile=certifi.where())
         
         # Enforce TLS 1.3 for maximum security
@@ -55,52 +144,48 @@ class SecurityManager:
         context.options |= ssl.OP_SINGLE_ECDH_USE
         
         self.logger.info("Ultra-secure SSL context initialized (2024 standards)")
+        _shared_ssl_context = context
         return context
         
-    def _generate_master_key(self) -> str:
+    def _generate_master_key(self) -> bytes:
         """Generate cryptographically secure master key"""
-        return secrets.token_urlsafe(32)
+        return secrets.token_bytes(32)
         
     def _init_encryption(self) -> Fernet:
         """Initialize military-grade encryption with PBKDF2 (OWASP 2024)"""
-        password = self.master_key.encode()
-        
-        # Use secure random salt
-        salt = secrets.token_bytes(32)
-        
+        # Use secure random salt, reused for this master key within the process
+        salt = _MASTER_KEY_SALTS.get(self.master_key)
+        if salt is None:
+            salt = _MASTER_KEY_SALTS[self.master_key] = secrets.token_bytes(_SALT_SIZE)
+            
         # Store salt for future decryption
         self._salt = salt
         
-        kdf = PBKDF2HMAC(
-            algorithm=hashes.SHA256(),  # Use SHA256 instead of SHA1
-            length=32,
-            salt=salt,
-            iterations=600000,  # OWASP 2024 recommendation (increased from 480k)
-        )
-        
-        key = base64.urlsafe_b64encode(kdf.derive(password))
-        return Fernet(key)
+        key = _derive_key(self.master_key, salt)
+        # AES-GCM encrypts new tokens (hardware AES on ARMv8/x86); Fernet
+        # with the same key still reads tokens written before the switch
+        self._aead = AESGCM(key)
+        return Fernet(base64.urlsafe_b64encode(key))
         
     def _check_rate_limit(self, operation: str, max_attempts: int = 5, window_seconds: int = 300) -> bool:
-        """Rate limiting for security operations"""
-        now = time.time()
-        
-        if operation not in self._rate_limiter:
-            self._rate_limiter[operation] = []
-            
-        # Clean old attempts
-        self._rate_limiter[operation] = [
-            timestamp for timestamp in self._rate_limiter[operation] 
-            if now - timestamp < window_seconds
-        ]
+        """Rate limiting for security operations (token bucket: max_attempts per window_seconds)"""
+        now = time.monotonic()
+        bucket = self._rate_limiter.get(operation)
+        if bucket is None:
+            bucket = self._rate_limiter[operation] = [now, float(max_attempts)]
+            
+        # Refill continuously, capped at a full burst of max_attempts
+        tokens = min(max_attempts, bucket[1] + (now - bucket[0]) * max_attempts / window_seconds)
+        bucket[0] = now
         
         # Check if limit exceeded
-        if len(self._rate_limiter[operation]) >= max_attempts:
+        if tokens < 1:
+            bucket[1] = tokens
             self.logger.warning(f"Rate limit exceeded for operation: {operation}")
             return False
             
-        # Add current attempt
-        self._rate_limiter[operation].append(now)
+        # Spend one token for this attempt
+        bucket[1] = tokens - 1
         return True
         
     def encrypt_token(self, token: str) -> str:
@@ -109,19 +194,14 @@ class SecurityManager:
             if not self._check_rate_limit("encrypt_token", max_attempts=10):
                 raise SecurityError("Rate limit exceeded for token encryption")
                 
-            # Enhanced metadata with security indicators
-            metadata = {
-                'token': token,
-                'encrypted_at': int(time.time()),
-                'salt': base64.urlsafe_b64encode(self._salt).decode(),
-                'algorithm': 'PBKDF2-HMAC-SHA256',
-                'iterations': 600000,
-                'version': '2.0'
-            }
-            
-            data = json.dumps(metadata).encode()
-            encrypted = self.cipher_suite.encrypt(data)
-            return base64.urlsafe_b64encode(encrypted).decode()
+            payload = (
+                _TOKEN_HEADER.pack(_TOKEN_FORMAT_VERSION, int(time.time()))
+                + self._salt
+                + token.encode('utf-8')
+            )
+            nonce = os.urandom(_NONCE_SIZE)
+            encrypted = self._aead.encrypt(nonce, payload, None)
+            return base64.urlsafe_b64encode(_AEAD_MARKER + nonce + encrypted).decode('ascii')
             
         except Exception as e:
             self.logger.error("Token encryption failed")  # Don't leak details
@@ -133,32 +213,50 @@ class SecurityManager:
             if not self._check_rate_limit("decrypt_token", max_attempts=20):
                 raise SecurityError("Rate limit exceeded for token decryption")
                 
-            encrypted_bytes = base64.urlsafe_b64decode(encrypted_token.encode())
-            decrypted_data = self.cipher_suite.decrypt(encrypted_bytes)
-            metadata = json.loads(decrypted_data.decode())
-            
-            # Enhanced validation
-            required_fields = ['token', 'encrypted_at', 'salt']
-            for field in required_fields:
-                if field not in metadata:
+            raw = base64.urlsafe_b64decode(encrypted_token.encode('ascii'))
+            if raw[:1] == _AEAD_MARKER:
+                nonce_end = 1 + _NONCE_SIZE
+                decrypted_data = self._aead.decrypt(raw[1:nonce_end], raw[nonce_end:], None)
+            else:
+                # Older Fernet tokens: stored as-is (version byte 0x80) or base64-encoded again
+                fernet_token = encrypted_token.encode('ascii') if raw[:1] == b'\x80' else raw
+                decrypted_data = self.cipher_suite.decrypt(fernet_token)
+            
+            if decrypted_data[:1] == b'{':
+                token, encrypted_at = self._parse_legacy_metadata(decrypted_data)
+            else:
+                version, encrypted_at = _TOKEN_HEADER.unpack_from(decrypted_data)
+                if version != _TOKEN_FORMAT_VERSION:
                     raise SecurityError("Invalid token metadata")
-            
+                token = decrypted_data[_TOKEN_HEADER.size + _SALT_SIZE:].decode('utf-8')
+                
             # Check token age (security policy)
-            age = int(time.time()) - metadata.get('encrypted_at', 0)
+            age = int(time.time()) - encrypted_at
             if age > (86400 * 90):  # 90 days
                 self.logger.warning(f"Token is {age//86400} days old - rotation recommended")
                 
-            # Validate algorithm if present
-            algorithm = metadata.get('algorithm', '')
-            if algorithm and 'PBKDF2' not in algorithm:
-                self.logger.warning("Token uses deprecated encryption algorithm")
-                
-            return metadata['token']
+            return token
             
         except Exception as e:
             self.logger.error("Token decryption failed")  # Don't leak details
             raise SecurityError("Decryption operation failed")
             
+    def _parse_legacy_metadata(self, data: bytes) -> tuple:
+        """Parse the version 1 JSON token metadata into (token, encrypted_at)"""
+        metadata = json.loads(data)
+        
+        try:
+            # 'salt' is required too, even though the derived key already fixes it
+            token, encrypted_at, _ = metadata['token'], metadata['encrypted_at'], metadata['salt']
+        except KeyError:
+            raise SecurityError("Invalid token metadata")
+            
+        algorithm = metadata.get('algorithm', '')
+        if algorithm and 'PBKDF2' not in algorithm:
+            self.logger.warning("Token uses deprecated encryption algorithm")
+            
+        return token, encrypted_at
+        
     def save_encrypted_token(self, token: str, filepath: str):
         """Save token with Android-compatible security"""
         try:
@@ -170,18 +268,20 @@ class SecurityManager:
             # Ensure directory exists
             Path(filepath).parent.mkdir(parents=True, exist_ok=True)
             
-            # Write with atomic operation
+            # Write with atomic operation; the temp file is created owner-only
+            # (Linux/Android) so the token is never briefly world-readable
             temp_filepath = filepath + '.tmp'
-            with open(temp_filepath, 'w', encoding='utf-8') as f:
+            try:
+                os.unlink(temp_filepath)  # Left over from an interrupted save
+            except FileNotFoundError:
+                pass
+            fd = os.open(temp_filepath, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
                 f.write(encrypted)
-            
-            # Atomic move
-            os.rename(temp_filepath, filepath)
-                
-            # Set secure permissions (Linux/Android)
-            if os.name != 'nt':
-                os.chmod(filepath, 0o600)
                 
+            # Atomic move (os.replace also overwrites on Windows)
+            os.replace(temp_filepath, filepath)
+            
             self.logger.info("Token securely saved")
             
         except Exception as e:
@@ -191,11 +291,9 @@ class SecurityManager:
     def load_encrypted_token(self, filepath: str) -> str:
         """Load and decrypt token with validation"""
         try:
-            if not os.path.exists(filepath):
-                raise SecurityError("Token file not found")
-                
-            with open(filepath, 'r', encoding='utf-8') as f:
-                encrypted = f.read().strip()
+            # Token files are ~200 ASCII bytes: one binary read, no text layer
+            with open(filepath, 'rb') as f:
+                encrypted = f.read().strip().decode('ascii')
                 
             if not encrypted:
                 raise SecurityError("Empty token file")
@@ -209,8 +307,8 @@ class SecurityManager:
             self.logger.error("Failed to load encrypted token")
             raise SecurityError("Token load operation failed")
             
-    async def create_secure_bot(self, token: str = None) -> Bot:
-        """Create bot with enhanced Android security"""
+    async def create_secure_bot(self, token: str = None, concurrency: int = 5) -> Bot:
+        """Create bot with enhanced Android security, pooled for `concurrency` parallel sends"""
         try:
             if not token:
                 raise SecurityError("No token provided")
@@ -218,35 +316,20 @@ class SecurityManager:
             if not self._validate_token_format(token):
                 raise SecurityError("Invalid token format detected")
                 
-            # Configure Android-optimized HTTP session with enhanced security
-            connector = aiohttp.TCPConnector(
-                ssl=self.ssl_context,
-                limit=30,  # Reduced for mobile security
-                limit_per_host=10,
-                timeout=aiohttp.ClientTimeout(
-                    total=60,      # Increased timeout for mobile networks
-                    connect=20,
-                    sock_read=40
-                ),
-                enable_cleanup_closed=True,
-                force_close=True,  # Enhanced security
-                keepalive_timeout=30
-            )
-            
-            session = aiohttp.ClientSession(
-                connector=connector,
-                headers={
-                    'User-Agent': 'TPMB-Android/2.1 (Secure)',
-                    'Accept': 'application/json',
-                    'Accept-Encoding': 'gzip, deflate',
-                    'Connection': 'keep-alive',
-                    'Cache-Control': 'no-cache'  # Security enhancement
-                },
-                timeout=aiohttp.ClientTimeout(total=60),
-                trust_env=False  # Don't use environment proxy settings for security
+            # Pooled HTTP/2 client: concurrent sends multiplex over one TLS
+            # connection instead of paying a handshake per request
+            request = SecureHTTPXRequest(
+                self.ssl_context,
+                # Room for command replies alongside a full send fan-out
+                connection_pool_size=concurrency * 2,
+                http_version="2",
+                connect_timeout=10.0,  # Increased timeouts for mobile networks
+                read_timeout=30.0,
+                write_timeout=30.0,
+                pool_timeout=10.0
             )
             
-            bot = Bot(token=token, session=session)
+            bot = Bot(token=token, request=request)
             
             self.logger.info("Secure Android bot created with enhanced security")
             return bot
@@ -267,33 +350,33 @@ class SecurityManager:
         if len(parts) != 2:
             return False
             
-        # Validate bot ID (numeric, reasonable range)
-        try:
-            bot_id = int(parts[0])
-            if bot_id <= 0 or bot_id > 9999999999:  # Reasonable bot ID range
-                return False
-        except ValueError:
+        # Validate bot ID (numeric, reasonable range); isdigit() rejects signs and spaces
+        id_part = parts[0]
+        if not (id_part.isascii() and id_part.isdigit() and len(id_part) <= 10):
             return False
-            
-        # Validate hash length and characters
-        hash_part = parts[1]
-        if len(hash_part) < 35 or len(hash_part) > 50:  # Telegram hash length range
+        if int(id_part) <= 0:
             return False
             
-        # Check for valid base64-like characters (enhanced)
-        if not re.match(r'^[A-Za-z0-9_-]{35,50}$', hash_part):
+        # Validate hash: Telegram length range, base64-like characters (enhanced)
+        if not _TOKEN_HASH_RE.match(parts[1]):
             return False
             
         # Additional security: check for suspicious patterns
-        if any(char * 10 in token for char in '0123456789abcdef'):
+        if any(run in token for run in _SUSPICIOUS_RUNS):
             self.logger.warning("Suspicious token pattern detected")
             return False
             
         return True
         
     async def verify_bot_connection(self, bot: Bot) -> bool:
-        """Verify bot with enhanced security checks"""
+        """Verify bot with enhanced security checks (successes cached for verify_ttl seconds)"""
         try:
+            # A bot's identity is fixed for its token; keyed by hash so the token isn't kept twice
+            token_key = hashlib.sha256(bot.token.encode()).hexdigest()
+            verified_at = self._verified_at.get(token_key)
+            if verified_at is not None and time.monotonic() - verified_at < self.verify_ttl:
+                return True
+                
             if not self._check_rate_limit("verify_bot", max_attempts=3):
                 raise SecurityError("Rate limit exceeded for bot verification")
                 
@@ -315,6 +398,7 @@ class SecurityManager:
                 self.logger.info("Bot does not support inline queries - normal for message bots")
                 
             self.logger.info(f"Bot verified: @{me.username} (ID: {me.id})")
+            self._verified_at[token_key] = time.monotonic()
             return True
             
         except Exception as e:
@@ -323,14 +407,18 @@ class SecurityManager:
             
     def generate_instance_key(self, instance_name: str) -> str:
         """Generate unique key for each bot instance with enhanced entropy"""
-        import hashlib
-        
         # Sanitize instance name
-        safe_name = re.sub(r'[^a-zA-Z0-9_-]', '', instance_name)[:32]
+        # Non-ASCII is dropped by the encode, the rest by a C-level byte filter
+        safe_name = instance_name.encode('ascii', 'ignore').translate(None, _UNSAFE_NAME_BYTES)[:32]
         
-        # Combine with enhanced entropy
-        unique_data = f"{safe_name}_{self.master_key}_{secrets.token_hex(16)}_{int(time.time())}"
-        return hashlib.sha256(unique_data.encode()).hexdigest()[:16]
+        # Combine with enhanced entropy, fed to the hash piece by piece
+        digest = hashlib.sha256(safe_name)
+        digest.update(b'_')
+        digest.update(self.master_key)
+        digest.update(b'_')
+        digest.update(secrets.token_bytes(16))
+        digest.update(struct.pack('<Q', int(time.time())))
+        return digest.hexdigest()[:16]
 
 class SecureConfigManager:
     """
@@ -341,6 +429,7 @@ class SecureConfigManager:
         self.security = security_manager
         self.config_dir = Path(config_dir)
         self.logger = logging.getLogger(__name__)
+        self._token_cache: Optional[tuple] = None  # (mtime_ns, token) of bot_token.enc
         
     def setup_secure_directories(self):
         """Setup secure directory structure with enhanced permissions"""
@@ -371,40 +460,53 @@ class SecureConfigManager:
         encrypted_file = self.config_dir / 'bot_token.enc'
         backup_file = self.config_dir / 'bot_token.txt.bak'
         
-        if plaintext_file.exists() and not encrypted_file.exists():
+        # Common case first: already migrated, one stat and done
+        if encrypted_file.exists():
+            return
+            
+        try:
             try:
-                with open(plaintext_file, 'r', encoding='utf-8') as f:
-                    token = f.read().strip()
-                    
-                if token and self.security._validate_token_format(token):
-                    # Create backup first
-                    import shutil
-                    shutil.copy2(plaintext_file, backup_file)
-                    
-                    # Encrypt and save
+                token = plaintext_file.read_text(encoding='utf-8').strip()
+            except FileNotFoundError:
+                return  # Nothing to migrate
+                
+            if token and self.security._validate_token_format(token):
+                # The plaintext file becomes the backup: a rename, no data copy
+                os.replace(plaintext_file, backup_file)
+                
+                # Encrypt and save
+                try:
                     self.security.save_encrypted_token(token, str(encrypted_file))
+                except Exception:
+                    os.replace(backup_file, plaintext_file)  # Retry on next start
+                    raise
                     
-                    # Secure delete of plaintext
-                    plaintext_file.unlink()
+                # Set backup permissions
+                if os.name != 'nt':
+                    os.chmod(backup_file, 0o600)
                     
-                    # Set backup permissions
-                    if os.name != 'nt':
-                        os.chmod(backup_file, 0o600)
-                    
-                    self.logger.info("Token migrated to encrypted storage with backup")
-                    
-            except Exception as e:
-                self.logger.error("Token migration failed")
-                raise SecurityError("Token migration failed")
+                self.logger.info("Token migrated to encrypted storage with backup")
                 
+        except Exception as e:
+            self.logger.error("Token migration failed")
+            raise SecurityError("Token migration failed")
+            
     def get_token(self) -> str:
         """Get token from secure storage with validation"""
         encrypted_file = self.config_dir / 'bot_token.enc'
         
-        if not encrypted_file.exists():
+        try:
+            mtime_ns = encrypted_file.stat().st_mtime_ns
+        except FileNotFoundError:
             raise SecurityError("No encrypted token found - please configure bot token")
             
-        return self.security.load_encrypted_token(str(encrypted_file))
+        # Reuse the decrypted token while the encrypted file is unchanged
+        if self._token_cache is not None and self._token_cache[0] == mtime_ns:
+            return self._token_cache[1]
+            
+        token = self.security.load_encrypted_token(str(encrypted_file))
+        self._token_cache = (mtime_ns, token)
+        return token
         
     def set_token(self, token: str):
         """Set token in secure storage with validation"""
@@ -413,6 +515,7 @@ class SecureConfigManager:
             
         encrypted_file = self.config_dir / 'bot_token.enc'
         self.security.save_encrypted_token(token, str(encrypted_file))
+        self._token_cache = None
 
 class SecurityError(Exception):
     """Custom security exception for enhanced error handling"""
@@ -1,13 +1,42 @@
-import ntplib
 import time
 import logging
 import asyncio
-from datetime import datetime, timedelta
-from typing import Optional, List
-import pytz
+import random
+from datetime import datetime
+from typing import Optional, List, Dict, Tuple
+try:
+    from zoneinfo import ZoneInfo
+except ImportError:  # Python < 3.9
+    from backports.zoneinfo import ZoneInfo
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.events import EVENT_JOB_ERROR, EVENT_JOB_MISSED
+from apscheduler.jobstores.base import JobLookupError
 import socket
+import struct
+
+# Delay before another sync may run after consecutive failures (seconds)
+_SYNC_BACKOFF = (5, 10, 20, 40, 80, 160, 320, 600)
+
+# Seconds between the NTP epoch (1900-01-01) and the unix epoch
+_NTP_EPOCH_DELTA = 2208988800
+_NS_PER_SECOND = 1_000_000_000
+_MIN_VALID_NTP_TIME_NS = 1_000_000_000 * _NS_PER_SECOND  # 2001-09-09
+_NTP_REQUEST = b'\x1b' + bytes(47)  # LI=0, VN=3, Mode=3 (client)
+_NTP_PACKET = struct.Struct('!12I')
+
+class _NTPProtocol(asyncio.DatagramProtocol):
+    """Hands NTP replies on the shared endpoint to the batch currently waiting"""
+    
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self.handler = None
+        
+    def datagram_received(self, data: bytes, addr):
+        if self.handler is not None:
+            self.handler(data, addr[0])
+            
+    def error_received(self, exc: Exception):
+        self.logger.debug(f"NTP receive error: {exc}")
 
 class ResilientTimeHandler:
     """
@@ -40,12 +69,26 @@ class ResilientTimeHandler:
         ]
         
         self.last_sync: Optional[datetime] = None
+        self._last_sync_monotonic = 0.0
+        self._dst_cache = (0.0, False)  # (valid_until timestamp, result)
+        self._backoff_idx = 0
+        self._next_allowed_sync = 0.0
         self.offset: float = 0.0
-        self.timezone = pytz.timezone(timezone)
+        self.offset_ns = 0
+        self.timezone = ZoneInfo(timezone)
+        self.timezone_str = str(self.timezone)
         self.sync_interval = 3600  # 1 hour
         self.max_retries = 2  # Reduced for mobile
         self.timeout = 8  # Reduced timeout for mobile networks
         self.drift_tolerance = 5.0  # seconds
+        self.ntp_batch_size = 4  # Servers queried concurrently per batch
+        self.dns_ttl = 900  # Cache NTP hostname resolutions for 15 minutes
+        self._dns_cache: Dict[str, Tuple[str, float]] = {}
+        self._ntp_transport: Optional[asyncio.DatagramTransport] = None
+        self._ntp_protocol: Optional[_NTPProtocol] = None
+        # host -> (successes, consecutive failures, last failure monotonic time)
+        self._server_stats: Dict[str, Tuple[int, int, float]] = {}
+        self._sync_in_flight: Optional[asyncio.Task] = None
         
         # Mobile network optimizations
         self.mobile_mode = True
@@ -61,69 +104,206 @@ class ResilientTimeHandler:
             return self.network_available
             
         try:
-            # Quick DNS lookup test
-            socket.gethostbyname('google.com')
+            # Connecting a UDP socket only performs a route lookup - no DNS
+            # query and no packet on the wire, so this never blocks the loop
+            with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+                sock.connect(('8.8.8.8', 53))
             self.network_available = True
             self.logger.debug("Network connectivity: OK")
-        except (socket.gaierror, socket.timeout):
+        except OSError:
             self.network_available = False
             self.logger.warning("Network connectivity: FAILED")
             
         self.last_network_check = current_time
         return self.network_available
         
+    async def _resolve(self, host: str, refresh: bool = False) -> str:
+        """Resolve an NTP hostname, reusing cached addresses within dns_ttl"""
+        now = time.monotonic()
+        cached = self._dns_cache.get(host)
+        if not refresh and cached is not None and now - cached[1] < self.dns_ttl:
+            return cached[0]
+            
+        infos = await asyncio.get_running_loop().getaddrinfo(
+            host, 123, family=socket.AF_INET, type=socket.SOCK_DGRAM
+        )
+        address = infos[0][4][0]
+        self._dns_cache[host] = (address, now)
+        return address
+        
+    async def prewarm_dns(self):
+        """Resolve all NTP servers ahead of time so syncs start from a warm cache"""
+        if not self._check_network_connectivity():
+            return
+            
+        # Failed lookups leave any previously cached address in place
+        results = await asyncio.gather(
+            *(self._resolve(server, refresh=True) for server in self.ntp_servers),
+            return_exceptions=True
+        )
+        resolved = sum(not isinstance(result, Exception) for result in results)
+        self.logger.debug(f"Pre-resolved {resolved}/{len(results)} NTP servers")
+        
+    async def _get_ntp_endpoint(self) -> Tuple[asyncio.DatagramTransport, _NTPProtocol]:
+        """Lazily open the UDP endpoint shared by all NTP queries"""
+        if self._ntp_transport is None or self._ntp_transport.is_closing():
+            self._ntp_transport, self._ntp_protocol = await asyncio.get_running_loop().create_datagram_endpoint(
+                _NTPProtocol, family=socket.AF_INET
+            )
+        return self._ntp_transport, self._ntp_protocol
+        
+    async def close(self):
+        """Cancel any in-flight sync and close the NTP socket"""
+        task = self._sync_in_flight
+        if task is not None and not task.done():
+            task.cancel()
+            await asyncio.wait({task}, timeout=2.0)
+            
+        if self._ntp_transport is not None:
+            self._ntp_transport.close()
+            self._ntp_transport = None
+            self._ntp_protocol = None
+            
+    def _record_server_result(self, server: str, success: bool):
+        """Update the health statistics used to order NTP servers"""
+        successes, failures, last_fail = self._server_stats.get(server, (0, 0, 0.0))
+        if success:
+            self._server_stats[server] = (successes + 1, 0, last_fail)
+        else:
+            self._server_stats[server] = (successes, failures + 1, time.monotonic())
+            
+    def _rank_servers(self) -> List[str]:
+        """Order NTP servers healthiest first, skipping ones that keep failing"""
+        now = time.monotonic()
+        servers = []
+        for server in self.ntp_servers:
+            _, failures, last_fail = self._server_stats.get(server, (0, 0, 0.0))
+            if failures > 5 and now - last_fail < 3600:
+                continue  # Benched for an hour after repeated failures
+            servers.append(server)
+            
+        if not servers:
+            servers = list(self.ntp_servers)
+            
+        # Shuffle first so equally healthy servers share the load
+        random.shuffle(servers)
+        
+        def health(server):
+            successes, failures, last_fail = self._server_stats.get(server, (0, 0, 0.0))
+            return (failures - successes, last_fail)
+            
+        servers.sort(key=health)
+        return servers
+        
+    async def _query_ntp_batch(self, servers: List[str]) -> Optional[int]:
+        """Send one request to every server on the shared endpoint and return the first valid reply"""
+        resolved = await asyncio.gather(*(self._resolve(server) for server in servers), return_exceptions=True)
+        addresses = {}
+        for server, address in zip(servers, resolved):
+            if isinstance(address, Exception):
+                self.logger.debug(f"NTP attempt failed {server}: {address}")
+                self._record_server_result(server, False)
+            else:
+                addresses[address] = server
+                
+        if not addresses:
+            return None
+            
+        transport, protocol = await self._get_ntp_endpoint()
+        result = asyncio.get_running_loop().create_future()
+        rejected = set()
+        sent_at = time.time_ns()
+        
+        def on_reply(data: bytes, address: str):
+            server = addresses.get(address)
+            if result.done() or server is None or len(data) < 48:
+                return  # Stray or late reply from an earlier batch
+                
+            received_at = time.time_ns()
+            fields = _NTP_PACKET.unpack_from(data)
+            # Timestamps are 32.32 fixed point seconds; convert to integer nanoseconds
+            rx_time = (fields[8] - _NTP_EPOCH_DELTA) * _NS_PER_SECOND + (fields[9] * _NS_PER_SECOND >> 32)
+            tx_time = (fields[10] - _NTP_EPOCH_DELTA) * _NS_PER_SECOND + (fields[11] * _NS_PER_SECOND >> 32)
+            offset = ((rx_time - sent_at) + (tx_time - received_at)) / 2 / _NS_PER_SECOND
+            
+            # Reject kiss-o'-death (stratum 0), unsynchronized (16), non-server
+            # replies and timestamps near the 1900 epoch before trusting the offset
+            stratum = (fields[0] >> 16) & 0xff
+            mode = (fields[0] >> 24) & 0x7
+            if stratum in (0, 16) or mode != 4 or tx_time < _MIN_VALID_NTP_TIME_NS:
+                self.logger.debug(f"Invalid NTP response from {server}: stratum={stratum}, mode={mode}")
+                valid = False
+            elif abs(offset) > 3600:  # > 1 hour is suspicious
+                self.logger.warning(f"Suspicious NTP response from {server}: offset={offset}")
+                valid = False
+            else:
+                valid = True
+                
+            if not valid:
+                if server not in rejected:
+                    rejected.add(server)
+                    self._record_server_result(server, False)
+                return
+                
+            self.logger.info(f"NTP sync successful: {server} (offset: {offset:.3f}s)")
+            self._record_server_result(server, True)
+            result.set_result(tx_time)
+            
+        protocol.handler = on_reply
+        try:
+            for address in addresses:
+                transport.sendto(_NTP_REQUEST, (address, 123))
+                
+            return await asyncio.wait_for(result, self.timeout)
+            
+        except asyncio.TimeoutError:
+            for server in addresses.values():
+                if server not in rejected:
+                    self._record_server_result(server, False)
+            return None
+        finally:
+            protocol.handler = None
+            
     async def get_ntp_time(self) -> Optional[float]:
-        """Get NTP time with mobile-optimized fallback strategy"""
+        """Get NTP time as a unix timestamp"""
+        ntp_time_ns = await self.get_ntp_time_ns()
+        return None if ntp_time_ns is None else ntp_time_ns / _NS_PER_SECOND
+        
+    async def get_ntp_time_ns(self) -> Optional[int]:
+        """Get NTP time in nanoseconds with mobile-optimized fallback strategy"""
         if not self._check_network_connectivity():
             self.logger.warning("No network - skipping NTP sync")
             return None
             
-        # Try servers in order, but with mobile-friendly timeouts
-        for i, server in enumerate(self.ntp_servers[:8]):  # Limit to first 8 servers
-            for attempt in range(self.max_retries):
-                try:
-                    self.logger.debug(f"Attempting NTP sync with {server} (attempt {attempt+1})")
-                    
-                    loop = asyncio.get_event_loop()
-                    client = ntplib.NTPClient()
-                    
-                    # Shorter timeout for mobile networks
-                    timeout = self.timeout if attempt == 0 else self.timeout * 2
-                    
-                    resp = await loop.run_in_executor(
-                        None,
-                        lambda: client.request(server, timeout=timeout, version=3)
-                    )
-                    
-                    # Validate response
-                    if resp.offset is None or abs(resp.offset) > 3600:  # > 1 hour is suspicious
-                        self.logger.warning(f"Suspicious NTP response from {server}: offset={resp.offset}")
-                        continue
-                        
-                    self.logger.info(f"NTP sync successful: {server} (offset: {resp.offset:.3f}s)")
-                    return resp.tx_time
-                    
-                except (socket.timeout, socket.gaierror, ntplib.NTPException) as e:
-                    self.logger.debug(f"NTP attempt failed {server}: {e}")
-                    if attempt < self.max_retries - 1:
-                        # Exponential backoff with jitter for mobile
-                        await asyncio.sleep(min(2 ** attempt + 0.1 * i, 5))
-                except Exception as e:
-                    self.logger.warning(f"Unexpected NTP error {server}: {e}")
-                    break  # Don't retry on unexpected errors
-                    
+        # Query the healthiest servers in small batches over one socket, so
+        # a stalled server costs at most one timeout instead of adding to it
+        servers = self._rank_servers()[:8]
+        for start in range(0, len(servers), self.ntp_batch_size):
+            batch = servers[start:start + self.ntp_batch_size]
+            self.logger.debug(f"Querying NTP servers: {', '.join(batch)}")
+            
+            ntp_time = await self._query_ntp_batch(batch)
+            if ntp_time is not None:
+                return ntp_time
+                
         self.logger.error("All NTP servers failed - using local time")
         return None
         
     async def sync_time(self) -> bool:
         """Synchronize time with enhanced error handling"""
+        if time.monotonic() < self._next_allowed_sync:
+            self.logger.debug("Time sync backing off after recent failures")
+            return False
+            
         try:
-            ntp_time = await self.get_ntp_time()
-            if ntp_time is None:
+            ntp_time_ns = await self.get_ntp_time_ns()
+            if ntp_time_ns is None:
+                self._back_off()
                 return False
                 
-            current_local = time.time()
-            self.offset = ntp_time - current_local
+            current_local_ns = time.time_ns()
+            self.offset_ns = ntp_time_ns - current_local_ns
+            self.offset = self.offset_ns / _NS_PER_SECOND
             
             # Detect significant time drift (potential DST change or system issue)
             if abs(self.offset) > self.drift_tolerance:
@@ -137,20 +317,48 @@ class ResilientTimeHandler:
                     self.logger.info("Time drift may be due to DST transition")
                     
             self.last_sync = datetime.now(self.timezone)
+            self._last_sync_monotonic = time.monotonic()
+            self._backoff_idx = 0
             
-            self.logger.info(
-                f"Time synchronized successfully: offset={self.offset:.3f}s, "
-                f"local_time={datetime.fromtimestamp(current_local, self.timezone)}, "
-                f"ntp_time={datetime.fromtimestamp(ntp_time, self.timezone)}"
-            )
+            if self.logger.isEnabledFor(logging.INFO):
+                self.logger.info(
+                    f"Time synchronized successfully: offset={self.offset:.3f}s, "
+                    f"local_time={datetime.fromtimestamp(current_local_ns / _NS_PER_SECOND, self.timezone)}, "
+                    f"ntp_time={datetime.fromtimestamp(ntp_time_ns / _NS_PER_SECOND, self.timezone)}"
+                )
             return True
             
         except Exception as e:
             self.logger.error(f"Time synchronization failed: {e}")
+            self._back_off()
             return False
             
+    def start_sync_time(self) -> asyncio.Task:
+        """Start a background sync unless one is already in flight"""
+        if self._sync_in_flight is None or self._sync_in_flight.done():
+            self._sync_in_flight = asyncio.create_task(self.sync_time())
+        return self._sync_in_flight
+        
+    async def sync_time_shared(self) -> bool:
+        """Synchronize time, joining a sync that is already in flight"""
+        # Shielded so one cancelled caller does not abort the sync for the others
+        return await asyncio.shield(self.start_sync_time())
+        
+    def _back_off(self):
+        """Delay the next sync attempt, growing the delay on each consecutive failure"""
+        delay = _SYNC_BACKOFF[self._backoff_idx]
+        self._backoff_idx = min(self._backoff_idx + 1, len(_SYNC_BACKOFF) - 1)
+        self._next_allowed_sync = time.monotonic() + delay
+        self.logger.debug(f"Next time sync allowed in {delay}s")
+        
     def _is_dst_transition_period(self) -> bool:
         """Check if we're in a DST transition period"""
+        # The answer only changes at local midnight, so reuse it until then
+        current = time.time()
+        valid_until, result = self._dst_cache
+        if current < valid_until:
+            return result
+            
         try:
             now = datetime.now(self.timezone)
             
@@ -158,13 +366,15 @@ class ResilientTimeHandler:
             # DST typically starts last Sunday in March, ends last Sunday in October in Europe
             
             if now.month == 3:  # March - spring transition
-                return now.day >= 25
+                result = now.day >= 25
             elif now.month == 10:  # October - fall transition  
-                return now.day >= 25
-            elif now.month in [2, 4, 9, 11]:  # Adjacent months
-                return True
+                result = now.day >= 25
+            else:
+                result = now.month in (2, 4, 9, 11)  # Adjacent months
                 
-            return False
+            seconds_into_day = now.hour * 3600 + now.minute * 60 + now.second
+            self._dst_cache = (current + 86400 - seconds_into_day, result)
+            return result
             
         except Exception:
             return False
@@ -178,13 +388,16 @@ class ResilientTimeHandler:
                 return datetime.now(self.timezone)
                 
             # Apply NTP correction to system time
-            corrected_timestamp = time.time() + self.offset
-            return datetime.fromtimestamp(corrected_timestamp, self.timezone)
+            return datetime.fromtimestamp(self.get_current_timestamp(), self.timezone)
             
         except Exception as e:
             self.logger.error(f"Error getting corrected time: {e}")
             return datetime.now(self.timezone)
             
+    def get_current_timestamp(self) -> float:
+        """Get corrected current unix timestamp without building a datetime"""
+        return (time.time_ns() + self.offset_ns) / _NS_PER_SECOND
+        
     def is_sync_needed(self) -> bool:
         """Determine if time synchronization is needed"""
         if self.last_sync is None:
@@ -193,15 +406,15 @@ class ResilientTimeHandler:
         # More frequent sync during DST transition periods
         interval = self.sync_interval // 2 if self._is_dst_transition_period() else self.sync_interval
         
-        time_since_sync = datetime.now(self.timezone) - self.last_sync
-        return time_since_sync > timedelta(seconds=interval)
+        # Monotonic clock: cheap, and immune to the wall-clock jumps we correct for
+        return time.monotonic() - self._last_sync_monotonic > interval
         
     def get_sync_status(self) -> dict:
         """Get detailed synchronization status"""
         return {
             'last_sync': self.last_sync.isoformat() if self.last_sync else None,
             'offset_seconds': self.offset,
-            'timezone': str(self.timezone),
+            'timezone': self.timezone_str,
             'network_available': self.network_available,
             'sync_needed': self.is_sync_needed(),
             'dst_transition_period': self._is_dst_transition_period()
@@ -218,18 +431,25 @@ class ResilientScheduler:
     """
     
     def __init__(self, timezone: str = 'Europe/Warsaw'):
-        self.timezone = pytz.timezone(timezone)
+        self.timezone = ZoneInfo(timezone)
         self.time_handler = ResilientTimeHandler(timezone)
         self.scheduler = None
         self.logger = logging.getLogger(__name__)
         self._running = False
         self._jobs_config = {}  # Store job configurations for recovery
+        self.start_attempts = 5
+        self._dns_task: Optional[asyncio.Task] = None
+        self.status_ttl = 2.0  # Seconds a job listing may be reused by get_status()
+        self._jobs_snapshot: Optional[Tuple[float, List[dict]]] = None
         
     async def initialize(self):
         """Initialize scheduler with time synchronization"""
         try:
+            # Resolve NTP servers in the background while the first sync runs
+            self._dns_task = asyncio.create_task(self.time_handler.prewarm_dns())
+            
             # Perform initial time sync
-            sync_success = await self.time_handler.sync_time()
+            sync_success = await self.time_handler.sync_time_shared()
             if sync_success:
                 self.logger.info("Initial time synchronization successful")
             else:
@@ -264,6 +484,16 @@ class ResilientScheduler:
                 replace_existing=True
             )
             
+            # Keep NTP server addresses fresh between hourly syncs
+            self.scheduler.add_job(
+                self.time_handler.prewarm_dns,
+                'interval',
+                seconds=self.time_handler.dns_ttl,
+                id='dns_refresh_job',
+                name='NTP DNS Refresh',
+                replace_existing=True
+            )
+            
             self.logger.info("Resilient scheduler initialized")
             
         except Exception as e:
@@ -275,7 +505,7 @@ class ResilientScheduler:
         try:
             if self.time_handler.is_sync_needed():
                 self.logger.debug("Performing scheduled time synchronization")
-                await self.time_handler.sync_time()
+                await self.time_handler.sync_time_shared()
             else:
                 self.logger.debug("Time sync not needed")
                 
@@ -284,6 +514,8 @@ class ResilientScheduler:
             
     def _job_error_listener(self, event):
         """Handle job execution errors"""
+        if not self.logger.isEnabledFor(logging.ERROR):
+            return
         self.logger.error(
             f"Job {event.job_id} crashed: {event.exception}\n"
             f"Traceback: {event.traceback}"
@@ -291,10 +523,13 @@ class ResilientScheduler:
         
     def _job_missed_listener(self, event):
         """Handle missed jobs (e.g., due to network interruption)"""
+        # Runs once per missed job, so a backlog after an outage stays cheap
+        if not self.logger.isEnabledFor(logging.WARNING):
+            return
         self.logger.warning(
             f"Job {event.job_id} missed scheduled time: "
-            f"scheduled={event.scheduled_run_time}, "
-            f"attempted={datetime.now(self.timezone)}"
+            f"scheduled={event.scheduled_run_time.isoformat()}, "
+            f"attempted={datetime.now(self.timezone).isoformat()}"
         )
         
     async def start(self):
@@ -302,20 +537,23 @@ class ResilientScheduler:
         if not self.scheduler:
             await self.initialize()
             
-        try:
-            self.scheduler.start()
-            self._running = True
-            self.logger.info("Resilient scheduler started")
-            
-            # Log scheduler status
-            status = self.time_handler.get_sync_status()
-            self.logger.info(f"Time sync status: {status}")
-            
-        except Exception as e:
-            self.logger.error(f"Scheduler start failed: {e}")
-            # Auto-retry after delay
-            await asyncio.sleep(10)
-            await self.start()
+        # Bounded retries with growing delays; the last failure reaches the caller
+        for attempt in range(self.start_attempts):
+            try:
+                self.scheduler.start()
+                break
+            except Exception as e:
+                self.logger.error(f"Scheduler start failed (attempt {attempt + 1}/{self.start_attempts}): {e}")
+                if attempt == self.start_attempts - 1:
+                    raise
+                await asyncio.sleep(min(10 * 2 ** attempt, 600))
+                
+        self._running = True
+        self.logger.info("Resilient scheduler started")
+        
+        # Log scheduler status
+        status = self.time_handler.get_sync_status()
+        self.logger.info(f"Time sync status: {status}")
             
     def add_job(self, func, trigger, **kwargs):
         """Add job with automatic error recovery wrapping"""
@@ -324,42 +562,50 @@ class ResilientScheduler:
             
         job_id = kwargs.get('id', f"job_{len(self._jobs_config)}")
         kwargs['id'] = job_id
+        requires_fresh_time = kwargs.pop('requires_fresh_time', False)
+        retry_on_failure = kwargs.pop('retry_on_failure', False)
+        max_retries = 3 if retry_on_failure else 0
         
         # Store job config for potential recovery
         self._jobs_config[job_id] = {
             'func': func,
             'trigger': trigger,
-            'kwargs': kwargs
+            'kwargs': kwargs,
+            'requires_fresh_time': requires_fresh_time,
+            'retry_on_failure': retry_on_failure
         }
         
         async def wrapped_func(*args, **func_kwargs):
             """Wrapper with comprehensive error handling and time checking"""
-            try:
-                # Check time synchronization before critical jobs
-                if self.time_handler.is_sync_needed():
-                    self.logger.debug(f"Syncing time before job {job_id}")
-                    await self.time_handler.sync_time()
+            # Retries are counted per run, so concurrent or later runs start fresh
+            for attempt in range(max_retries + 1):
+                try:
+                    # Only jobs that opted in wait for a sync; others run on time
+                    # while a stale clock is refreshed in the background
+                    if self.time_handler.is_sync_needed():
+                        if requires_fresh_time:
+                            self.logger.debug(f"Syncing time before job {job_id}")
+                            await self.time_handler.sync_time_shared()
+                        else:
+                            self.time_handler.start_sync_time()
+                            
+                    # Execute the actual function
+                    await func(*args, **func_kwargs)
+                    return
                     
-                # Execute the actual function
-                await func(*args, **func_kwargs)
-                
-            except asyncio.CancelledError:
-                self.logger.info(f"Job {job_id} was cancelled")
-                raise
-            except Exception as e:
-                self.logger.error(f"Job {job_id} failed: {e}")
-                
-                # Implement retry logic for critical jobs
-                if kwargs.get('retry_on_failure', False):
-                    retry_count = getattr(wrapped_func, '_retry_count', 0)
-                    if retry_count < 3:
-                        wrapped_func._retry_count = retry_count + 1
-                        self.logger.info(f"Retrying job {job_id} (attempt {retry_count + 1})")
-                        await asyncio.sleep(2 ** retry_count)  # Exponential backoff
-                        await wrapped_func(*args, **func_kwargs)
-                    else:
-                        self.logger.error(f"Job {job_id} failed after 3 retries")
-                        
+                except asyncio.CancelledError:
+                    self.logger.info(f"Job {job_id} was cancelled")
+                    raise
+                except Exception as e:
+                    self.logger.error(f"Job {job_id} failed: {e}")
+                    
+                if attempt < max_retries:
+                    self.logger.info(f"Retrying job {job_id} (attempt {attempt + 1})")
+                    await asyncio.sleep(2 ** attempt)  # Exponential backoff
+                elif retry_on_failure:
+                    self.logger.error(f"Job {job_id} failed after {max_retries} retries")
+                    
+        self._jobs_snapshot = None
         return self.scheduler.add_job(wrapped_func, trigger, **kwargs)
         
     def remove_job(self, job_id: str):
@@ -367,11 +613,12 @@ class ResilientScheduler:
         if self.scheduler:
             try:
                 self.scheduler.remove_job(job_id)
-            except:
-                pass
+            except JobLookupError:
+                pass  # Already gone
                 
         if job_id in self._jobs_config:
             del self._jobs_config[job_id]
+        self._jobs_snapshot = None
             
     def get_job(self, job_id: str):
         """Get job by ID"""
@@ -379,7 +626,7 @@ class ResilientScheduler:
             return self.scheduler.get_job(job_id)
         return None
         
-    def shutdown(self):
+    async def shutdown(self):
         """Graceful shutdown of scheduler"""
         if self.scheduler and self._running:
             try:
@@ -389,6 +636,15 @@ class ResilientScheduler:
             except Exception as e:
                 self.logger.error(f"Scheduler shutdown error: {e}")
                 
+        # Drain background time work so the NTP socket does not outlive the scheduler
+        try:
+            if self._dns_task is not None and not self._dns_task.done():
+                self._dns_task.cancel()
+                await asyncio.wait({self._dns_task}, timeout=2.0)
+            await self.time_handler.close()
+        except Exception as e:
+            self.logger.error(f"Time handler shutdown error: {e}")
+                
     def get_status(self) -> dict:
         """Get comprehensive scheduler status"""
         status = {
@@ -398,13 +654,23 @@ class ResilientScheduler:
         }
         
         if self.scheduler:
-            status['active_jobs'] = [
-                {
-                    'id': job.id,
-                    'name': job.name,
-                    'next_run': job.next_run_time.isoformat() if job.next_run_time else None
-                }
-                for job in self.scheduler.get_jobs()
-            ]
+            status['active_jobs'] = self._get_jobs_snapshot()
             
         return status
+        
+    def _get_jobs_snapshot(self) -> List[dict]:
+        """List scheduled jobs (cached for status_ttl seconds, reset on add/remove)"""
+        now = time.monotonic()
+        if self._jobs_snapshot is not None and now - self._jobs_snapshot[0] < self.status_ttl:
+            return self._jobs_snapshot[1]
+            
+        jobs = [
+            {
+                'id': job.id,
+                'name': job.name,
+                'next_run': job.next_run_time.isoformat() if job.next_run_time else None
+            }
+            for job in self.scheduler.get_jobs()
+        ]
+        self._jobs_snapshot = (now, jobs)
+        return jobs